@@ -0,0 +1,114 @@
+"""Concurrent read throughput of the sync (WSGI) and async (ASGI) views.
+
+Start the servers to compare, for example:
+
+    python manage.py runserver 8000 --noreload
+    uvicorn social_media_api.asgi:application --port 8001 --workers 1
+
+then point one --target at each endpoint:
+
+    python benchmarks/asgi_throughput.py \\
+        --email admin@gmail.com --password 1qazcde3 \\
+        --target wsgi=http://127.0.0.1:8000/api/media/posts/ \\
+        --target asgi=http://127.0.0.1:8001/api/media/async/posts/
+
+Only the standard library is used, so the script runs anywhere.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def obtain_token(token_url: str, email: str, password: str) -> str:
+    request = urllib.request.Request(
+        token_url,
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["access"]
+
+
+def timed_get(url: str, token: str) -> tuple[float, bool]:
+    request = urllib.request.Request(
+        url, headers={"Authorization": f"Bearer {token}"}
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, TimeoutError):
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def run(url: str, token: str, requests: int, concurrency: int) -> dict:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # warm up connections, caches and the auth cache
+        list(executor.map(lambda _: timed_get(url, token), range(concurrency)))
+
+        started = time.perf_counter()
+        results = list(
+            executor.map(lambda _: timed_get(url, token), range(requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, ok in results if ok)
+    errors = sum(not ok for _, ok in results)
+    if not latencies:
+        return {"rps": 0.0, "p50": 0.0, "p95": 0.0, "errors": errors}
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        metavar="NAME=URL",
+        help="Endpoint to load, may be repeated",
+    )
+    parser.add_argument("--token", help="JWT access token to send")
+    parser.add_argument("--email", help="Obtain a token for this user")
+    parser.add_argument("--password")
+    parser.add_argument(
+        "--token-url", default="http://127.0.0.1:8000/api/users/token/"
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    options = parser.parse_args()
+
+    token = options.token
+    if token is None:
+        if not (options.email and options.password):
+            parser.error("pass --token, or --email and --password")
+        token = obtain_token(
+            options.token_url, options.email, options.password
+        )
+
+    print(
+        f"{'target':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}"
+    )
+    for target in options.target:
+        name, _, url = target.partition("=")
+        result = run(url, token, options.requests, options.concurrency)
+        print(
+            f"{name:<12}{result['rps']:>10.1f}{result['p50']:>10.1f}"
+            f"{result['p95']:>10.1f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
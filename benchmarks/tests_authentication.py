@@ -0,0 +1,82 @@
+"""Per-request cost of `CachedJWTAuthentication` against the stock one.
+
+Skipped unless `BENCHMARK=1` is set, for example:
+
+    BENCHMARK=1 python manage.py test benchmarks.tests_authentication
+
+The same token-authenticated request is sent `BENCHMARK_REPEAT` times
+with simplejwt's `JWTAuthentication` and with `CachedJWTAuthentication`.
+The suite fails unless the cached one saves the user query on every
+request after the first, and prints the latency of both.
+"""
+
+import os
+import time
+import unittest
+from typing import Type
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.tests_endpoints import REPEAT, percentile
+from user.authentication import CachedJWTAuthentication
+
+
+@unittest.skipUnless(os.environ.get("BENCHMARK"), "set BENCHMARK=1")
+class AuthenticationBenchmark(TestCase):
+    def setUp(self) -> None:
+        user = get_user_model().objects.create_user(
+            email="benchmark@gmail.com",
+            nickname="benchmark",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    def measure(self, authentication: Type[BaseAuthentication]) -> dict:
+        caches["auth"].clear()
+        url = reverse("users:suggestions")
+        durations = []
+        with mock.patch.object(
+            APIView, "authentication_classes", [authentication]
+        ):
+            self.assertEqual(self.client.get(url).status_code, 200)
+            with CaptureQueriesContext(connection) as context:
+                for _ in range(REPEAT):
+                    started = time.perf_counter()
+                    self.client.get(url)
+                    durations.append((time.perf_counter() - started) * 1000)
+        return {
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "queries": len(context) / REPEAT,
+        }
+
+    def test_user_query_is_saved(self) -> None:
+        results = {
+            "stock": self.measure(JWTAuthentication),
+            "cached": self.measure(CachedJWTAuthentication),
+        }
+
+        for name, result in results.items():
+            print(
+                f"{name:>24} p50 {result['p50_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  "
+                f"{result['queries']:5.2f} queries per request"
+            )
+        self.assertEqual(
+            results["stock"]["queries"] - results["cached"]["queries"], 1
+        )
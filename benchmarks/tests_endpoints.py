@@ -0,0 +1,179 @@
+"""Latency and query-count budgets of the main endpoints.
+
+Skipped unless `BENCHMARK=1` is set, for example:
+
+    BENCHMARK=1 python manage.py test benchmarks
+
+Every scenario of `BENCHMARK_SCENARIOS` ("<posts>:<follows>" pairs, the
+average number of users followed per user) is seeded with the
+`generate_load_data` command and rolled back afterwards. Each endpoint is
+requested once on cold caches to count its queries, then
+`BENCHMARK_REPEAT` times through the test client for its latency, with
+the response cache expiring entries at once so that cached retrieves
+measure the view. The suite fails when:
+
+- an endpoint runs more queries in a bigger scenario than in the
+  smallest one, i.e. the query count grows with the data, or
+- its p95 latency exceeds the baseline stored in `baselines.json` by more
+  than `BENCHMARK_TOLERANCE` times.
+
+`BENCHMARK_UPDATE_BASELINES=1` rewrites `baselines.json` from the run,
+do this on the machine the suite is compared on.
+"""
+
+import json
+import os
+import statistics
+import time
+import unittest
+from io import StringIO
+from pathlib import Path
+from typing import Callable
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from post.models import Post
+from user.models import User, UserFollowing
+
+BASELINES = Path(__file__).with_name("baselines.json")
+SCENARIOS = [
+    tuple(int(value) for value in scenario.split(":"))
+    for scenario in os.environ.get(
+        "BENCHMARK_SCENARIOS", "1000:5,100000:50"
+    ).split(",")
+]
+REPEAT = int(os.environ.get("BENCHMARK_REPEAT", 20))
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", 1.5))
+POSTS_PER_USER = 10
+
+
+def percentile(samples: list[float], percent: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[
+        percent - 1
+    ]
+
+
+@unittest.skipUnless(os.environ.get("BENCHMARK"), "set BENCHMARK=1")
+class EndpointBenchmark(TestCase):
+    def seed(self, posts: int, follows: int) -> None:
+        for alias in caches:
+            caches[alias].clear()
+        call_command(
+            "generate_load_data",
+            users=max(posts // POSTS_PER_USER, 100),
+            posts=POSTS_PER_USER,
+            follows=follows,
+            seed=1,
+            stdout=StringIO(),
+        )
+
+        # the heaviest reader and their most liked post, object
+        # permissions of PostViewSet only let owners retrieve posts
+        self.reader = User.objects.order_by("-following_count").first()
+        self.post = (
+            Post.objects.filter(user=self.reader)
+            .order_by("-likes_count")
+            .first()
+        )
+        self.targets = iter(
+            User.objects.exclude(pk=self.reader.pk)
+            .exclude(
+                pk__in=UserFollowing.objects.filter(
+                    user_id=self.reader
+                ).values("following_user_id")
+            )
+            .values_list("email", flat=True)[: REPEAT + 2]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def requests(self) -> dict[str, Callable]:
+        post_url = reverse("posts:post-detail", args=[self.post.pk])
+        comment_url = reverse("posts:post-comment", args=[self.post.pk])
+        return {
+            "feed": lambda: self.client.get(reverse("posts:post-list")),
+            "retrieve": lambda: self.client.get(post_url),
+            "liked": lambda: self.client.get(reverse("posts:post-liked")),
+            "comment": lambda: self.client.post(
+                comment_url, {"commentary": "benchmark"}
+            ),
+            "follow": lambda: self.client.post(
+                reverse("users:following-list-list"),
+                {
+                    "user_id": self.reader.email,
+                    "following_user_id": next(self.targets),
+                },
+            ),
+            "user-list": lambda: self.client.get(reverse("users:create")),
+        }
+
+    def measure(self, request: Callable) -> dict:
+        # queries are counted on cold caches, where an N+1 would show
+        for alias in caches:
+            caches[alias].clear()
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        self.assertLess(response.status_code, 300, response.content)
+        queries = len(context)
+
+        # latency of the views, not of response cache hits: payloads
+        # expire at once, the rest of the caches is warmed up again
+        durations = []
+        with override_settings(RESPONSE_CACHE_TTL=0):
+            for alias in caches:
+                caches[alias].clear()
+            request()
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                request()
+                durations.append((time.perf_counter() - started) * 1000)
+        return {
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "queries": queries,
+        }
+
+    def test_endpoints(self) -> None:
+        results = {}
+        for posts, follows in SCENARIOS:
+            with transaction.atomic():
+                self.seed(posts, follows)
+                for name, request in self.requests().items():
+                    results[f"{name}@{posts}:{follows}"] = self.measure(
+                        request
+                    )
+                transaction.set_rollback(True)
+
+        for key, result in results.items():
+            print(
+                f"{key:>24} p50 {result['p50_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  "
+                f"{result['queries']:3d} queries"
+            )
+
+        if os.environ.get("BENCHMARK_UPDATE_BASELINES"):
+            BASELINES.write_text(json.dumps(results, indent=4) + "\n")
+            return
+        baselines = json.loads(BASELINES.read_text())
+
+        smallest = "{}:{}".format(*SCENARIOS[0])
+        for key, result in results.items():
+            name = key.split("@")[0]
+            with self.subTest(key):
+                self.assertLessEqual(
+                    result["queries"],
+                    results[f"{name}@{smallest}"]["queries"],
+                    "query count grows with the data",
+                )
+                if key in baselines:
+                    self.assertLessEqual(
+                        result["p95_ms"],
+                        baselines[key]["p95_ms"] * TOLERANCE,
+                        "p95 latency over the baseline",
+                    )
@@ -1,5 +1,19 @@
 from django.contrib import admin
 
-from post.models import Post
+from post.models import DeletionJob, Post
 
 admin.site.register(Post)
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "kind",
+        "object_id",
+        "status",
+        "step",
+        "deleted_rows",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "kind")
@@ -0,0 +1,67 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponse
+from rest_framework import status
+
+from post import timeline
+from post.models import Post
+from post.serializers import PostListSerializer
+from post.views import with_latest_commentaries
+from social_media_api.async_views import (
+    AsyncAPIView,
+    decode_cursor,
+    next_page_url,
+    page_size,
+)
+
+
+async def _feed(request: HttpRequest) -> QuerySet[Post]:
+    # may read the follow graph from the DB on a cache miss
+    queryset = await sync_to_async(timeline.feed_for)(request.user)
+    return with_latest_commentaries(queryset.select_related("user"))
+
+
+class AsyncPostFeedView(AsyncAPIView):
+    """Home feed, served without holding a worker thread"""
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        queryset = await _feed(request)
+        cursor = request.GET.get("cursor")
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=pk)
+            )
+
+        size = page_size(request)
+        posts = [post async for post in queryset[: size + 1]]
+        next_url = None
+        if len(posts) > size:
+            posts = posts[:size]
+            next_url = next_page_url(
+                request, posts[-1].created_at, posts[-1].pk
+            )
+
+        serializer = PostListSerializer(
+            posts, many=True, context={"request": request}
+        )
+        return self.render({"next": next_url, "results": serializer.data})
+
+
+class AsyncPostDetailView(AsyncAPIView):
+    """Own or followed post, served without holding a worker thread"""
+
+    async def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        queryset = with_latest_commentaries(
+            timeline.visible_to(request.user).select_related("user")
+        )
+        try:
+            post = await queryset.aget(pk=pk)
+        except Post.DoesNotExist:
+            return self.render(
+                {"detail": "Not found."}, status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = PostListSerializer(post, context={"request": request})
+        return self.render(serializer.data)
@@ -0,0 +1,330 @@
+"""Deletion of posts and accounts in bounded chunks.
+
+Deleting a post or an account only marks it (`deleted_at` on the post,
+or on the account and all its posts, plus `is_active=False`) and queues
+a `DeletionJob`, so the request holds no long lock. The job purges the
+dependent likes, commentaries, followings, timeline entries and hashtag
+links `settings.DELETION_CHUNK_SIZE` rows per transaction, recording its
+progress on the job, and deletes the object itself last.
+
+Jobs are run by a background thread of the web process after the
+deletion is committed (`settings.DELETION_WORKER_THREADS`, 0 disables
+it) and by the `drain_deletion_queue` command. Purging is idempotent, so
+a job interrupted by a crash can simply be requeued.
+"""
+
+import logging
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, connection, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from post.models import (
+    Commentary,
+    DeletionJob,
+    Hashtag,
+    Like,
+    Post,
+    PostHashtag,
+    TimelineEntry,
+)
+from social_media_api.cache import bump_version
+from user import graph
+from user.models import FollowSuggestion, Unfollow, User, UserFollowing
+from user.signals import followings_deleted
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DELETION_WORKER_THREADS
+            )
+        return _executor
+
+
+def _drain_in_background() -> None:
+    try:
+        drain()
+    except Exception:
+        logger.exception("Draining the deletion queue failed")
+    finally:
+        close_old_connections()
+
+
+def _enqueue(kind: str, object_id: int) -> None:
+    DeletionJob.objects.create(kind=kind, object_id=object_id)
+    if settings.DELETION_WORKER_THREADS:
+        transaction.on_commit(
+            lambda: _get_executor().submit(_drain_in_background)
+        )
+
+
+def delete_post(post: Post) -> None:
+    """Hides `post` at once and queues the purge of its rows."""
+
+    with transaction.atomic():
+        post.deleted_at = timezone.now()
+        post.save(update_fields=["deleted_at"])
+        _enqueue(DeletionJob.Kind.POST, post.pk)
+
+
+def delete_account(user: User) -> None:
+    """Deactivates `user` and hides their posts at once, queues the purge
+    of their rows."""
+
+    with transaction.atomic():
+        user.is_active = False
+        user.deleted_at = timezone.now()
+        user.save(update_fields=["is_active", "deleted_at"])
+        post_ids = list(
+            Post.objects.filter(user=user).values_list("pk", flat=True)
+        )
+        Post.objects.filter(pk__in=post_ids).update(
+            deleted_at=user.deleted_at
+        )
+        _enqueue(DeletionJob.Kind.USER, user.pk)
+    # update() sends no post_save, the cached posts are invalidated here
+    for post_id in post_ids:
+        bump_version("post", post_id)
+
+
+def _chunks(queryset: models.QuerySet) -> Iterator[list[int]]:
+    """Primary keys of `queryset`, a chunk at a time.
+
+    Every chunk is expected to be deleted before the next one is read.
+    """
+
+    while True:
+        chunk = list(
+            queryset.order_by().values_list("pk", flat=True)[
+                : settings.DELETION_CHUNK_SIZE
+            ]
+        )
+        if not chunk:
+            return
+        yield chunk
+
+
+def _delete(
+    model: type[models.Model], pks: list[int], returning: str
+) -> list[int]:
+    """Deletes rows by primary key without signals or cascades, returns
+    the `returning` field of the rows that were actually deleted."""
+
+    meta = model._meta
+    field = meta.pk if returning == "pk" else meta.get_field(returning)
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(meta.db_table)} "
+            f"WHERE {quote(meta.pk.column)} "
+            f"IN ({', '.join(['%s'] * len(pks))}) "
+            f"RETURNING {quote(field.column)}",
+            pks,
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _decrement(model: type[models.Model], field: str, pks: list[int]) -> None:
+    """Lowers `field` of every row once per occurrence in `pks`."""
+
+    by_amount = defaultdict(list)
+    for pk, amount in Counter(pks).items():
+        by_amount[amount].append(pk)
+    for amount, chunk in by_amount.items():
+        model._base_manager.filter(pk__in=chunk).update(
+            **{field: Greatest(F(field) - amount, 0)}
+        )
+
+
+class _Purge:
+    """Deletes the rows of one job, chunk by chunk"""
+
+    def __init__(self, job: DeletionJob) -> None:
+        self.job = job
+
+    def progress(self, step: str, deleted: int) -> None:
+        DeletionJob.objects.filter(pk=self.job.pk).update(
+            step=step, deleted_rows=F("deleted_rows") + deleted
+        )
+
+    def rows(
+        self,
+        step: str,
+        queryset: models.QuerySet,
+        returning: str = "pk",
+        after: Optional[Callable[[list[int]], None]] = None,
+    ) -> None:
+        """Deletes `queryset`, running `after` with the `returning` field
+        of every deleted chunk in its transaction.
+
+        Counters are adjusted by the rows the DELETE reports, so rows
+        written or removed concurrently are never counted twice.
+        """
+
+        for pks in _chunks(queryset):
+            with transaction.atomic():
+                deleted = _delete(queryset.model, pks, returning)
+                if after is not None and deleted:
+                    after(deleted)
+            self.progress(step, len(deleted))
+
+    def posts(self, post_ids: list[int]) -> None:
+        post_type = ContentType.objects.get_for_model(Post)
+        self.rows(
+            "likes",
+            Like.objects.filter(
+                content_type=post_type, object_id__in=post_ids
+            ),
+        )
+        self.rows("commentaries", Commentary.objects.filter(post__in=post_ids))
+        self.rows(
+            "timeline entries",
+            TimelineEntry.objects.filter(post__in=post_ids),
+        )
+        self.rows(
+            "hashtags",
+            PostHashtag.objects.filter(post__in=post_ids),
+            returning="hashtag",
+            after=lambda hashtag_ids: _decrement(
+                Hashtag, "posts_count", hashtag_ids
+            ),
+        )
+
+        # what is left to cascade is empty, signals unindex the posts
+        deleted, _ = Post.all_objects.filter(pk__in=post_ids).delete()
+        self.progress("posts", deleted)
+
+    def post(self, post_id: int) -> None:
+        self.posts([post_id])
+
+    @staticmethod
+    def _uncount(field: str) -> Callable[[list[int]], None]:
+        def uncount(post_ids: list[int]) -> None:
+            _decrement(Post, field, post_ids)
+            for post_id in set(post_ids):
+                bump_version("post", post_id)
+
+        return uncount
+
+    @staticmethod
+    def _unfollowed(follower_ids: list[int]) -> None:
+        _decrement(User, "following_count", follower_ids)
+        Unfollow.objects.bulk_create(
+            Unfollow(user_id=follower_id) for follower_id in follower_ids
+        )
+        for follower_id in follower_ids:
+            graph.invalidate_following(follower_id)
+            bump_version("user", follower_id)
+
+    @staticmethod
+    def _unfollowing(user_id: int, following_ids: list[int]) -> None:
+        followings_deleted.send(
+            sender=UserFollowing, user_id=user_id, following_ids=following_ids
+        )
+
+    def user(self, user_id: int) -> None:
+        for post_ids in _chunks(Post.all_objects.filter(user_id=user_id)):
+            self.posts(post_ids)
+
+        post_type = ContentType.objects.get_for_model(Post)
+        self.rows(
+            "own likes",
+            Like.objects.filter(user_id=user_id, content_type=post_type),
+            returning="object_id",
+            after=self._uncount("likes_count"),
+        )
+        self.rows("own likes", Like.objects.filter(user_id=user_id))
+        self.rows(
+            "own commentaries",
+            Commentary.objects.filter(user_id=user_id),
+            returning="post",
+            after=self._uncount("comments_count"),
+        )
+        self.rows(
+            "followers",
+            UserFollowing.objects.filter(following_user_id=user_id),
+            returning="user_id",
+            after=self._unfollowed,
+        )
+        self.rows(
+            "followings",
+            UserFollowing.objects.filter(user_id=user_id),
+            returning="following_user_id",
+            after=lambda following_ids: self._unfollowing(
+                user_id, following_ids
+            ),
+        )
+        self.rows(
+            "timeline entries", TimelineEntry.objects.filter(owner=user_id)
+        )
+        self.rows(
+            "suggestions",
+            FollowSuggestion.objects.filter(
+                models.Q(user=user_id) | models.Q(suggested=user_id)
+            ),
+        )
+
+        deleted, _ = User.objects.filter(pk=user_id).delete()
+        self.progress("account", deleted)
+        graph.invalidate_popular()
+
+
+def claim_job() -> Optional[DeletionJob]:
+    """Marks the oldest pending job as running and returns it."""
+
+    with transaction.atomic():
+        job = (
+            DeletionJob.objects.select_for_update(skip_locked=True)
+            .filter(status=DeletionJob.Status.PENDING)
+            .order_by("pk")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = DeletionJob.Status.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def run_job(job: DeletionJob) -> None:
+    purge = _Purge(job)
+    try:
+        getattr(purge, job.kind)(job.object_id)
+    except Exception as exc:
+        logger.exception("Deletion job %s failed", job.pk)
+        job.status = DeletionJob.Status.FAILED
+        job.error = repr(exc)
+    else:
+        job.status = DeletionJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at"])
+
+
+def drain(limit: Optional[int] = None) -> int:
+    """Runs pending jobs until none is left, returns how many ran."""
+
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
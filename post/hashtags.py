@@ -0,0 +1,122 @@
+import re
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from post.models import Hashtag, Post, PostHashtag
+
+HASHTAG_RE = re.compile(r"#(\w+)")
+HASHTAG_MAX_LENGTH = Hashtag._meta.get_field("name").max_length
+
+
+def normalize_hashtag(name: str) -> str:
+    """Canonical form of a hashtag: no leading `#`, case-folded."""
+
+    return name.lstrip("#").casefold()[:HASHTAG_MAX_LENGTH]
+
+
+def extract_hashtags(content: str) -> set[str]:
+    """Returns the normalized hashtags mentioned in `content`."""
+
+    return {normalize_hashtag(name) for name in HASHTAG_RE.findall(content)}
+
+
+def _get_or_create_hashtags(names: Iterable[str]) -> dict[str, int]:
+    names = set(names)
+    Hashtag.objects.bulk_create(
+        [Hashtag(name=name) for name in names], ignore_conflicts=True
+    )
+    return dict(
+        Hashtag.objects.filter(name__in=names).values_list("name", "id")
+    )
+
+
+def sync_post_hashtags(post: Post) -> None:
+    """Updates the hashtag index of `post` after its content changed."""
+
+    names = extract_hashtags(post.content)
+    current = dict(
+        PostHashtag.objects.filter(post=post).values_list(
+            "hashtag__name", "hashtag_id"
+        )
+    )
+    removed = [current[name] for name in current.keys() - names]
+    added = names - current.keys()
+    if not removed and not added:
+        return
+
+    with transaction.atomic():
+        if removed:
+            PostHashtag.objects.filter(
+                post=post, hashtag_id__in=removed
+            ).delete()
+            Hashtag.objects.filter(id__in=removed).update(
+                posts_count=Greatest(F("posts_count") - 1, 0)
+            )
+        if added:
+            hashtag_ids = _get_or_create_hashtags(added).values()
+            PostHashtag.objects.bulk_create(
+                [
+                    PostHashtag(
+                        post=post,
+                        hashtag_id=hashtag_id,
+                        post_created_at=post.created_at,
+                    )
+                    for hashtag_id in hashtag_ids
+                ],
+                ignore_conflicts=True,
+            )
+            Hashtag.objects.filter(id__in=hashtag_ids).update(
+                posts_count=F("posts_count") + 1
+            )
+
+
+def unlink_post_hashtags(post: Post) -> None:
+    """Decrements tag counters of `post` before it is deleted."""
+
+    Hashtag.objects.filter(post_hashtags__post=post).update(
+        posts_count=Greatest(F("posts_count") - 1, 0)
+    )
+
+
+def index_hashtags(posts: Iterable[Post]) -> int:
+    """Indexes hashtags of many posts at once, returns links created."""
+
+    tagged = {post: extract_hashtags(post.content) for post in posts}
+    names = set().union(*tagged.values())
+    if not names:
+        return 0
+
+    with transaction.atomic():
+        hashtag_ids = _get_or_create_hashtags(names)
+        links = PostHashtag.objects.bulk_create(
+            [
+                PostHashtag(
+                    post=post,
+                    hashtag_id=hashtag_ids[name],
+                    post_created_at=post.created_at,
+                )
+                for post, post_names in tagged.items()
+                for name in post_names
+            ],
+            ignore_conflicts=True,
+        )
+        refresh_hashtag_counters(hashtag_ids.values())
+    return len(links)
+
+
+def refresh_hashtag_counters(hashtag_ids: Iterable[int]) -> None:
+    """Recomputes `posts_count` of the given hashtags."""
+
+    posts = (
+        PostHashtag.objects.filter(hashtag=OuterRef("pk"))
+        .order_by()
+        .values("hashtag")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Hashtag.objects.filter(id__in=list(hashtag_ids)).update(
+        posts_count=Coalesce(Subquery(posts), Value(0))
+    )
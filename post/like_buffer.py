@@ -0,0 +1,295 @@
+"""Write-behind buffering of like toggles.
+
+With `settings.LIKE_WRITE_BEHIND` the like and unlike endpoints only
+record the wanted state of the (post, user) pair in process memory and
+answer with it right away, so bursts on a viral post do not queue up on
+the `likes_count` row of that post. Only the last toggle of every pair is
+kept. A background thread flushes the buffer every
+`settings.LIKE_FLUSH_INTERVAL` seconds: likes are inserted and unlikes
+deleted in batches, and the counters of the touched posts are moved by
+the rows those statements report as written.
+
+The buffer is flushed again when the process exits normally, and a
+failed flush is put back to be retried, so a crash (or SIGKILL) loses at
+most the toggles of the last interval. Buffers are per process: the
+counter returned by a worker includes its own pending toggles only,
+other workers see them after the next flush.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from post import timeline
+from post.models import Like, Post
+from post.services import LikeState
+from social_media_api.cache import bump_version
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class _Toggle(NamedTuple):
+    liked: bool
+    # whether the pair was liked in the database when first buffered
+    stored: bool
+
+    @property
+    def delta(self) -> int:
+        return int(self.liked) - int(self.stored)
+
+
+def _returning(sql: str, params: list) -> list[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _insert_likes(pairs: list[tuple[int, int]]) -> list[int]:
+    """Likes the (post id, user id) pairs that are not liked yet, returns
+    the post id of every like written."""
+
+    meta = Like._meta
+    quote = connection.ops.quote_name
+    columns = [
+        meta.get_field(name).column
+        for name in ("content_type", "object_id", "user", "created")
+    ]
+    content_type = ContentType.objects.get_for_model(Post).pk
+    created = meta.get_field("created").get_db_prep_save(
+        timezone.now(), connection
+    )
+    params = []
+    for post_id, user_id in pairs:
+        params.extend([content_type, post_id, user_id, created])
+    return _returning(
+        f"INSERT INTO {quote(meta.db_table)} "
+        f"({', '.join(map(quote, columns))}) "
+        f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(pairs))} "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(columns[1])}",
+        params,
+    )
+
+
+def _delete_likes(post_id: int, user_ids: list[int]) -> list[int]:
+    """Unlikes the post for `user_ids`, returns the post id of every like
+    removed."""
+
+    meta = Like._meta
+    quote = connection.ops.quote_name
+    content_type, object_id, user = (
+        quote(meta.get_field(name).column)
+        for name in ("content_type", "object_id", "user")
+    )
+    return _returning(
+        f"DELETE FROM {quote(meta.db_table)} "
+        f"WHERE {content_type} = %s AND {object_id} = %s "
+        f"AND {user} IN ({', '.join(['%s'] * len(user_ids))}) "
+        f"RETURNING {object_id}",
+        [ContentType.objects.get_for_model(Post).pk, post_id, *user_ids],
+    )
+
+
+class LikeBuffer:
+    """Pending like toggles of this process, by (post id, user id)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[int, int], _Toggle] = {}
+        # taken by the running flush, until it is committed
+        self._flushing: dict[tuple[int, int], _Toggle] = {}
+        # sums of the like count changes of both, by post id
+        self._deltas: dict[int, int] = {}
+        self._flushing_deltas: dict[int, int] = {}
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def toggle(
+        self, post_id: int, user: User, liked: bool
+    ) -> Optional[LikeState]:
+        """Buffers the like state of `user` on the post, returns the new
+        state or None for posts unknown or not visible to `user`."""
+
+        likes_count = (
+            timeline.visible_to(user)
+            .filter(pk=post_id)
+            .values_list("likes_count", flat=True)
+            .first()
+        )
+        if likes_count is None:
+            return None
+
+        key = (post_id, user.pk)
+        with self._lock:
+            stored = self._stored(key)
+        if stored is None:
+            stored = Like.objects.filter(
+                content_type=ContentType.objects.get_for_model(Post),
+                object_id=post_id,
+                user=user,
+            ).exists()
+
+        with self._lock:
+            # a concurrent toggle of the same pair may have won the race
+            previous = self._pending.get(key)
+            if previous is not None:
+                stored = previous.stored
+                self._deltas[post_id] -= previous.delta
+            toggle = _Toggle(liked=liked, stored=stored)
+            self._pending[key] = toggle
+            self._deltas[post_id] = self._deltas.get(post_id, 0) + toggle.delta
+            delta = self._deltas[post_id] + self._flushing_deltas.get(
+                post_id, 0
+            )
+        self._start()
+        return LikeState(liked=liked, likes_count=max(likes_count + delta, 0))
+
+    def _stored(self, key: tuple[int, int]) -> Optional[bool]:
+        """Like state of the pair in the database, when already known"""
+
+        if key in self._pending:
+            return self._pending[key].stored
+        if key in self._flushing:
+            # what the running flush writes
+            return self._flushing[key].liked
+        return None
+
+    def flush(self) -> int:
+        """Writes the pending toggles, returns how many were written."""
+
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+                self._flushing_deltas, self._deltas = self._deltas, {}
+            if not batch:
+                return 0
+            try:
+                written = self._write(batch)
+            except Exception:
+                logger.exception("Flushing %d like toggles failed", len(batch))
+                with self._lock:
+                    # newer toggles of the same pairs take precedence
+                    for key, toggle in batch.items():
+                        if key not in self._pending:
+                            self._pending[key] = toggle
+                            self._deltas[key[0]] = (
+                                self._deltas.get(key[0], 0) + toggle.delta
+                            )
+                    self._flushing, self._flushing_deltas = {}, {}
+                raise
+            with self._lock:
+                self._flushing, self._flushing_deltas = {}, {}
+            return written
+
+    @staticmethod
+    def _write(batch: dict[tuple[int, int], _Toggle]) -> int:
+        post_ids = set(
+            Post.objects.filter(
+                pk__in={post_id for post_id, _ in batch}
+            ).values_list("pk", flat=True)
+        )
+        # a single toggle of a deleted account must not fail every flush
+        user_ids = set(
+            User.objects.filter(
+                pk__in={user_id for _, user_id in batch},
+                deleted_at__isnull=True,
+            ).values_list("pk", flat=True)
+        )
+        batch = {
+            (post_id, user_id): toggle
+            for (post_id, user_id), toggle in batch.items()
+            if post_id in post_ids and user_id in user_ids
+        }
+        liked = []
+        unliked: dict[int, list[int]] = {}
+        for (post_id, user_id), toggle in batch.items():
+            if toggle.liked:
+                liked.append((post_id, user_id))
+            else:
+                unliked.setdefault(post_id, []).append(user_id)
+
+        deltas = Counter()
+        with transaction.atomic():
+            size = settings.LIKE_FLUSH_BATCH_SIZE
+            for start in range(0, len(liked), size):
+                deltas.update(_insert_likes(liked[start : start + size]))
+            for post_id, user_ids in unliked.items():
+                deltas.subtract(_delete_likes(post_id, user_ids))
+            # only the rows written here count, so concurrent flushes and
+            # toggles of other workers are never counted twice
+            by_delta = defaultdict(list)
+            for post_id, delta in deltas.items():
+                if delta:
+                    by_delta[delta].append(post_id)
+            for delta, delta_post_ids in by_delta.items():
+                Post.objects.filter(pk__in=delta_post_ids).update(
+                    likes_count=Greatest(F("likes_count") + delta, 0)
+                )
+        # neither write sends the signals invalidating the cached posts
+        for post_id in {post_id for post_id, _ in batch}:
+            bump_version("post", post_id)
+        return len(batch)
+
+    def _start(self) -> None:
+        if self._thread is not None or not settings.LIKE_FLUSH_INTERVAL:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="like-buffer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.LIKE_FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception:
+                pass  # logged by flush(), retried on the next interval
+            finally:
+                close_old_connections()
+
+    def close(self) -> None:
+        """Stops the flushing thread and writes what is left."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+        self.flush()
+
+
+buffer = LikeBuffer()
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        buffer.close()
+    except Exception:
+        pass  # logged by flush()
+
+
+def add_like(post_id: int, user: User) -> Optional[LikeState]:
+    return buffer.toggle(post_id, user, liked=True)
+
+
+def remove_like(post_id: int, user: User) -> Optional[LikeState]:
+    return buffer.toggle(post_id, user, liked=False)
+
+
+def flush() -> int:
+    return buffer.flush()
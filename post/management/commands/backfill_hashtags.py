@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from post.hashtags import index_hashtags
+from post.models import Post
+
+
+class Command(BaseCommand):
+    help = "Indexes hashtags of existing posts"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of posts indexed per transaction",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        batch_size = options["batch_size"]
+        posts = Post.objects.only("id", "content", "created_at").order_by("pk")
+
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            indexed += index_hashtags(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} post hashtag(s)")
+        )
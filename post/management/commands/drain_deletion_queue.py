@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from post import deletion
+from post.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = "Purges deleted posts and accounts queued for deletion"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Maximum number of jobs to run",
+        )
+        parser.add_argument(
+            "--requeue",
+            action="store_true",
+            help="Retry failed jobs and jobs left running by a crash first",
+        )
+        parser.add_argument(
+            "--forever",
+            action="store_true",
+            help="Keep polling the queue, to run as a worker",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls with --forever",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        if options["requeue"]:
+            requeued = DeletionJob.objects.filter(
+                status__in=(
+                    DeletionJob.Status.RUNNING,
+                    DeletionJob.Status.FAILED,
+                )
+            ).update(status=DeletionJob.Status.PENDING, error="")
+            self.stdout.write(f"Requeued {requeued} job(s)")
+
+        while True:
+            ran = deletion.drain(options["limit"])
+            if ran:
+                self.stdout.write(self.style.SUCCESS(f"Ran {ran} job(s)"))
+            if not options["forever"]:
+                break
+            time.sleep(options["interval"])
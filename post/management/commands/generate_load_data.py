@@ -0,0 +1,362 @@
+"""Synthetic production-like data for load testing.
+
+Follow edges and post popularity follow power laws: a few users gather
+most followers and a few posts most likes. Rows are written without
+model signals, in batches: `COPY` on PostgreSQL, batched INSERTs
+elsewhere. `bulk_create` is not used because it overwrites the
+`auto_now_add` timestamps the data is spread over. Counters, hashtags,
+search indexes and home timelines are rebuilt in set-based passes at the
+end.
+"""
+
+import csv
+import io
+import json
+import random
+from array import array
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from post.hashtags import index_hashtags
+from post.models import Commentary, Like, Post, TimelineEntry
+from post.search import rebuild_post_index
+from post.services import refresh_post_counters
+from user import graph
+from user.models import User, UserFollowing
+from user.search import rebuild_user_index
+from user.services import refresh_follow_counters
+
+# shape of the Pareto degree distributions, heavier tails when lower
+PARETO_ALPHA = 1.5
+# exponent skewing picks of followed users and liked posts to the head
+POPULARITY_SKEW = 3
+WORDS = (
+    "coffee morning city night music friends weekend travel book movie "
+    "sunset photo dinner work code run rain summer beach mountain game "
+    "today finally love new best great little happy long quiet"
+).split()
+HASHTAGS = (
+    "django python travel food music photography fitness books art "
+    "coding nature football"
+).split()
+
+
+def _db_value(field: models.Field, obj: models.Model) -> object:
+    value = getattr(obj, field.attname)
+    if isinstance(field, models.JSONField):
+        return json.dumps(value)
+    return field.get_db_prep_save(value, connection)
+
+
+def _insert(objs: list[models.Model]) -> None:
+    """Writes `objs` of one model as is, without signals or pre_save."""
+
+    if not objs:
+        return
+
+    meta = objs[0]._meta
+    fields = [field for field in meta.concrete_fields if not field.primary_key]
+    rows = [[_db_value(field, obj) for field in fields] for obj in objs]
+    table = connection.ops.quote_name(meta.db_table)
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(
+                    ["\\N" if value is None else value for value in row]
+                )
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {table} ({columns}) FROM STDIN "
+                "WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+        else:
+            placeholders = ", ".join(["%s"] * len(fields))
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                rows,
+            )
+
+
+def _fill_timelines(first_owner_id: int, last_owner_id: int) -> None:
+    """Fans out all posts to the timelines of the given new users.
+
+    The per-author backfill limit of `post.timeline` is not applied.
+    """
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {TimelineEntry._meta.db_table}
+                (owner_id, post_id, created)
+            SELECT f.user_id_id, p.id, p.created_at
+            FROM {UserFollowing._meta.db_table} f
+            JOIN {User._meta.db_table} a ON a.id = f.following_user_id_id
+            JOIN {Post._meta.db_table} p ON p.user_id = a.id
+            WHERE f.user_id_id BETWEEN %s AND %s
+                AND a.followers_count <= %s
+            UNION ALL
+            SELECT p.user_id, p.id, p.created_at
+            FROM {Post._meta.db_table} p
+            WHERE p.user_id BETWEEN %s AND %s
+            """,
+            [
+                first_owner_id,
+                last_owner_id,
+                settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+                first_owner_id,
+                last_owner_id,
+            ],
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users, followings, posts, commentaries and likes for "
+        "load testing"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument(
+            "--follows",
+            type=int,
+            default=20,
+            help="Average number of users followed per user",
+        )
+        parser.add_argument(
+            "--posts",
+            type=int,
+            default=10,
+            help="Average number of posts per user",
+        )
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=2,
+            help="Average number of commentaries per post",
+        )
+        parser.add_argument(
+            "--likes",
+            type=int,
+            default=5,
+            help="Average number of likes per post",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Number of past days the activity is spread over",
+        )
+        parser.add_argument(
+            "--password",
+            default="loadtest",
+            help="Password of every generated user",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int)
+        parser.add_argument(
+            "--skip-timelines",
+            action="store_true",
+            help="Do not fan generated posts out to home timelines",
+        )
+
+    def _degree(self, mean: int, limit: int) -> int:
+        scale = mean * (PARETO_ALPHA - 1) / PARETO_ALPHA
+        return min(int(self.rng.paretovariate(PARETO_ALPHA) * scale), limit)
+
+    def _popular(self, ids: array) -> int:
+        return ids[int(len(ids) * self.rng.random() ** POPULARITY_SKEW)]
+
+    def _moment(self, since: datetime) -> datetime:
+        return since + (self.now - since) * self.rng.random()
+
+    def _content(self, max_length: int) -> str:
+        words = self.rng.choices(WORDS, k=self.rng.randint(3, 30))
+        if self.rng.random() < 0.3:
+            words.append(f"#{self.rng.choice(HASHTAGS)}")
+        return " ".join(words)[:max_length]
+
+    def _write(self, label: str, objs: list[models.Model]) -> None:
+        _insert(objs)
+        self.written[label] = self.written.get(label, 0) + len(objs)
+        objs.clear()
+
+    def _flush(self, label: str, objs: list[models.Model]) -> None:
+        if len(objs) >= self.batch_size:
+            self._write(label, objs)
+
+    def generate_users(self, count: int, password: str) -> array:
+        offset = (User.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        # hashing is deliberately slow, every user shares one hash
+        password = make_password(password)
+        users = []
+        for number in range(offset, offset + count):
+            users.append(
+                User(
+                    email=f"load{number}@example.com",
+                    nickname=f"load{number}",
+                    password=password,
+                    date_of_birth=date(1950, 1, 1)
+                    + timedelta(days=self.rng.randrange(20_000)),
+                    biography=self._content(100),
+                    date_joined=self._moment(self.since),
+                )
+            )
+            self._flush("users", users)
+        self._write("users", users)
+
+        return array(
+            "q",
+            User.objects.filter(pk__gte=offset)
+            .order_by("pk")
+            .values_list("pk", flat=True),
+        )
+
+    def generate_followings(self, user_ids: array, mean: int) -> None:
+        followings = []
+        for user_id in user_ids:
+            followed = {
+                self._popular(user_ids)
+                for _ in range(self._degree(mean, len(user_ids) - 1))
+            }
+            followed.discard(user_id)
+            followings.extend(
+                UserFollowing(
+                    user_id_id=user_id,
+                    following_user_id_id=followed_id,
+                    created=self._moment(self.since),
+                )
+                for followed_id in followed
+            )
+            self._flush("followings", followings)
+        self._write("followings", followings)
+
+    def generate_posts(self, user_ids: array, mean: int) -> None:
+        posts = []
+        for user_id in user_ids:
+            for _ in range(self._degree(mean, mean * 100)):
+                created_at = self._moment(self.since)
+                posts.append(
+                    Post(
+                        user_id=user_id,
+                        content=self._content(280),
+                        created_at=created_at,
+                        create_date=created_at.date(),
+                    )
+                )
+            self._flush("posts", posts)
+        self._write("posts", posts)
+
+    def generate_reactions(
+        self, user_ids: array, first_post_id: int, comments: int, likes: int
+    ) -> None:
+        post_type = ContentType.objects.get_for_model(Post)
+        posts = Post.objects.filter(pk__gte=first_post_id).order_by("pk")
+        commentaries = []
+        post_likes = []
+        last_pk = first_post_id - 1
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).values_list("pk", "created_at")[
+                    : self.batch_size
+                ]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            for post_id, created_at in batch:
+                for _ in range(self._degree(comments, len(user_ids))):
+                    commentaries.append(
+                        Commentary(
+                            post_id=post_id,
+                            user_id=self.rng.choice(user_ids),
+                            commentary=self._content(350),
+                            created_at=self._moment(created_at),
+                        )
+                    )
+                likers = {
+                    self.rng.choice(user_ids)
+                    for _ in range(self._degree(likes, len(user_ids)))
+                }
+                post_likes.extend(
+                    Like(
+                        user_id=user_id,
+                        content_type=post_type,
+                        object_id=post_id,
+                        created=self._moment(created_at),
+                    )
+                    for user_id in likers
+                )
+                self._flush("commentaries", commentaries)
+                self._flush("likes", post_likes)
+        self._write("commentaries", commentaries)
+        self._write("likes", post_likes)
+
+    def index(self, first_post_id: int) -> None:
+        refresh_follow_counters()
+        graph.invalidate_popular()
+        refresh_post_counters(batch_size=self.batch_size)
+
+        posts = Post.objects.only("id", "content", "created_at").order_by("pk")
+        last_pk = first_post_id - 1
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[: self.batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            index_hashtags(batch)
+
+        rebuild_post_index()
+        rebuild_user_index()
+
+    def fan_out(self, user_ids: array) -> None:
+        for start in range(0, len(user_ids), self.batch_size):
+            owner_ids = user_ids[start : start + self.batch_size]
+            _fill_timelines(owner_ids[0], owner_ids[-1])
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.since = self.now - timedelta(days=options["days"])
+        self.written = {}
+        first_post_id = (
+            Post.objects.aggregate(last=Max("pk"))["last"] or 0
+        ) + 1
+
+        user_ids = self.generate_users(options["users"], options["password"])
+        if not user_ids:
+            return
+        self.generate_followings(user_ids, options["follows"])
+        self.generate_posts(user_ids, options["posts"])
+        self.generate_reactions(
+            user_ids, first_post_id, options["comments"], options["likes"]
+        )
+        self.stdout.write(
+            ", ".join(
+                f"{count} {label}" for label, count in self.written.items()
+            )
+        )
+
+        self.stdout.write("Rebuilding counters and indexes")
+        self.index(first_post_id)
+        if not options["skip_timelines"]:
+            self.stdout.write("Filling home timelines")
+            self.fan_out(user_ids)
+
+        self.stdout.write(self.style.SUCCESS("Load data generated"))
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+
+from post.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Rebuilds fan-out home timelines from posts and followings"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "users",
+            nargs="*",
+            help="Emails of users to rebuild (all users by default)",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        users = get_user_model().objects.order_by("pk")
+        if options["users"]:
+            users = users.filter(email__in=options["users"])
+
+        rebuilt = 0
+        for user in users.iterator():
+            rebuild_timeline(user)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timeline(s)"))
@@ -0,0 +1,40 @@
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from social_media_api import cache
+from social_media_api.middleware import is_enabled, set_enabled
+
+STATES = {"on": True, "off": False, "default": None}
+
+
+class Command(BaseCommand):
+    help = (
+        "Switches per-request query instrumentation on or off in all "
+        "running workers, through the cache they share (CACHE_URL)"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "state",
+            nargs="?",
+            choices=STATES,
+            help="`default` falls back to settings.REQUEST_INSTRUMENTATION, "
+            "without a state the current one is shown",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        if options["state"] is not None:
+            if not cache.is_shared():
+                raise CommandError(
+                    "The cache is local to this process, set CACHE_URL to "
+                    "switch running workers"
+                )
+            set_enabled(STATES[options["state"]])
+
+        state = "on" if is_enabled() else "off"
+        self.stdout.write(
+            self.style.SUCCESS(f"Request instrumentation is {state}")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from post.services import refresh_post_counters
+
+
+class Command(BaseCommand):
+    help = "Reconciles denormalized like/comment counters on posts"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of posts updated per statement",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        fixed = refresh_post_counters(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Counters fixed for {fixed} post(s)")
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("post", "0003_post_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="like",
+            name="created",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "content_type", "object_id"],
+                name="like_user_object_idx",
+            ),
+        ),
+    ]
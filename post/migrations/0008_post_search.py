@@ -0,0 +1,77 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    """
+    CREATE FUNCTION post_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('english', NEW.content);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER post_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF content ON post_post
+    FOR EACH ROW EXECUTE FUNCTION post_search_vector_update()
+    """,
+    "UPDATE post_post SET search_vector = to_tsvector('english', content)",
+    "CREATE INDEX post_search_vector_idx ON post_post USING gin (search_vector)",
+]
+
+POSTGRESQL_BACKWARDS = [
+    "DROP INDEX IF EXISTS post_search_vector_idx",
+    "DROP TRIGGER IF EXISTS post_search_vector_trigger ON post_post",
+    "DROP FUNCTION IF EXISTS post_search_vector_update()",
+]
+
+# SQLite has no tsvector: a standalone FTS5 table, kept in sync from
+# post.search, provides the (degraded) indexed search path for local runs.
+SQLITE_FORWARDS = [
+    "CREATE VIRTUAL TABLE post_post_fts USING fts5(content)",
+    "INSERT INTO post_post_fts(rowid, content) SELECT id, content FROM post_post",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TABLE IF EXISTS post_post_fts",
+]
+
+
+def run_vendor_sql(statements: dict):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("post", "0007_hashtags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    "postgresql": POSTGRESQL_FORWARDS,
+                    "sqlite": SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    "postgresql": POSTGRESQL_BACKWARDS,
+                    "sqlite": SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:00
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Post = apps.get_model("post", "Post")
+    Like = apps.get_model("post", "Like")
+
+    duplicates = (
+        Like.objects.values("user", "content_type", "object_id")
+        .annotate(first_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Like.objects.filter(
+            user=duplicate["user"],
+            content_type=duplicate["content_type"],
+            object_id=duplicate["object_id"],
+        ).exclude(id=duplicate["first_id"]).delete()
+
+    post_type = ContentType.objects.filter(
+        app_label="post", model="post"
+    ).first()
+    if post_type is None:
+        return
+
+    likes = (
+        Like.objects.filter(content_type=post_type, object_id=OuterRef("pk"))
+        .order_by()
+        .values("object_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Post.objects.update(likes_count=Coalesce(Subquery(likes), Value(0)))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("post", "0008_post_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_likes, migrations.RunPython.noop
+        ),
+        migrations.RemoveIndex(
+            model_name="like",
+            name="like_user_object_idx",
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["content_type", "object_id"], name="like_object_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                fields=("user", "content_type", "object_id"),
+                name="unique_like",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("post", "0009_unique_like"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commentary",
+            index=models.Index(
+                fields=["post", "-id"], name="commentary_post_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_popular_posts(apps, schema_editor):
+    # posts of the authors that are popular now were never fanned out
+    Post = apps.get_model("post", "Post")
+    Post.objects.filter(
+        user__followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    ).update(fanned_out=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("post", "0012_soft_delete"),
+        ("user", "0002_user_followers_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="fanned_out",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("fanned_out", False)),
+                fields=["user"],
+                name="post_not_fanned_out_idx",
+            ),
+        ),
+        migrations.RunPython(mark_popular_posts, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,7 @@ from django.contrib.contenttypes.fields import (
     GenericRelation,
 )
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
 
@@ -30,12 +31,48 @@ class Like(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey("content_type", "object_id")
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "content_type", "object_id"],
+                name="unique_like",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id"],
+                name="like_object_idx",
+            ),
+        ]
+
+
+class Hashtag(models.Model):
+    """Normalized hashtag extracted from post contents"""
+
+    name = models.CharField(max_length=100, unique=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return f"#{self.name}"
+
+
+class PostManager(models.Manager):
+    """Posts that are not waiting to be purged"""
+
+    def get_queryset(self) -> models.QuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Post(models.Model):
     """Post model"""
 
     create_date = models.DateField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
     content = models.CharField(max_length=280)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -46,20 +83,79 @@ class Post(models.Model):
     image = models.ImageField(
         null=True, blank=True, upload_to=movie_image_file_path
     )
+    # filled in by the image pipeline, see social_media_api.images
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_variants = models.JSONField(default=dict, editable=False)
+    hashtags = models.ManyToManyField(
+        Hashtag, through="PostHashtag", related_name="posts", blank=True
+    )
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # maintained by a database trigger, see migration 0008_post_search
+    search_vector = SearchVectorField(null=True, editable=False)
+    # set when the post is deleted, its rows are purged by a DeletionJob
+    deleted_at = models.DateTimeField(null=True, editable=False)
+    # False when the author was too popular to fan the post out, the post
+    # is then merged into the feeds of followers on read, see post.timeline
+    fanned_out = models.BooleanField(default=True, editable=False)
+
+    objects = PostManager()
+    all_objects = models.Manager()
 
     def __str__(self) -> str:
         return self.content[:25]
 
     @property
     def total_likes(self) -> int:
-        return self.likes.count()
+        return self.likes_count
 
     class Meta:
-        ordering = ["-create_date"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"], name="post_created_at_id_idx"
+            ),
+            models.Index(
+                fields=["user", "-created_at"], name="post_user_created_at_idx"
+            ),
+            models.Index(
+                fields=["user"],
+                condition=models.Q(fanned_out=False),
+                name="post_not_fanned_out_idx",
+            ),
+        ]
+
+
+class PostHashtag(models.Model):
+    """Hashtag of a post, indexed by tag and post creation time"""
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+    post_created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hashtag", "post"],
+                name="unique_post_hashtag",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["hashtag", "-post_created_at", "-post"],
+                name="hashtag_post_created_idx",
+            ),
+        ]
 
 
 class Commentary(models.Model):
     commentary = models.CharField(max_length=350)
+    created_at = models.DateTimeField(auto_now_add=True)
     post = models.ForeignKey(
         Post, on_delete=models.CASCADE, related_name="commentaries"
     )
@@ -69,5 +165,83 @@ class Commentary(models.Model):
         related_name="commentaries",
     )
 
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="commentary_user_created_idx",
+            ),
+            models.Index(fields=["post", "-id"], name="commentary_post_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return self.commentary[:14]
+
+
+class TimelineEntry(models.Model):
+    """Post delivered to the home timeline of `owner`"""
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    created = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "post"],
+                name="unique_timeline_entry",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["owner", "-created"],
+                name="timeline_owner_created_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.post} in timeline of {self.owner}"
+
+
+class DeletionJob(models.Model):
+    """Queued purge of a deleted post or account, see post.deletion"""
+
+    class Kind(models.TextChoices):
+        POST = "post"
+        USER = "user"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    kind = models.CharField(max_length=4, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(
+        max_length=7, choices=Status.choices, default=Status.PENDING
+    )
+    # progress: the table being purged and the rows deleted so far
+    step = models.CharField(max_length=50, blank=True)
+    deleted_rows = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "id"], name="deletion_job_status_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Deletion of {self.kind} {self.object_id} ({self.status})"
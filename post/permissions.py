@@ -18,6 +18,7 @@ class IsAuthenticatedOrAnonymous(BasePermission):
                 "like",
                 "unlike",
                 "remove_all_comments",
+                "comments",
             )
             + SAFE_METHODS
         ):
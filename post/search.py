@@ -0,0 +1,104 @@
+"""Full-text search over post contents.
+
+PostgreSQL matches the trigger-maintained `Post.search_vector` column
+through its GIN index. SQLite, used for local runs, has no tsvector and
+falls back to an FTS5 table kept in sync by the functions below.
+"""
+
+import re
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, QuerySet
+from django.db.models.expressions import RawSQL
+
+from post.models import Post
+
+SEARCH_CONFIG = "english"
+WORD_RE = re.compile(r"\w+")
+
+
+def fts5_query(query: str) -> str:
+    """Quotes every word so that user input is never parsed as FTS5 syntax."""
+
+    return " ".join(f'"{word}"' for word in WORD_RE.findall(query))
+
+
+def search_posts(
+    query: str, posts: Optional[QuerySet[Post]] = None
+) -> QuerySet[Post]:
+    """Posts matching `query` among `posts` (all by default), the most
+    relevant first."""
+
+    if posts is None:
+        posts = Post.objects.all()
+
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        return (
+            posts.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-id")
+        )
+
+    match = fts5_query(query)
+    if not match:
+        return posts.none()
+
+    return (
+        posts.filter(
+            id__in=RawSQL(
+                "SELECT rowid FROM post_post_fts WHERE post_post_fts MATCH %s",
+                (match,),
+            )
+        )
+        .annotate(
+            rank=RawSQL(
+                "SELECT -bm25(post_post_fts) FROM post_post_fts "
+                "WHERE post_post_fts MATCH %s AND rowid = post_post.id",
+                (match,),
+            )
+        )
+        .order_by("-rank", "-id")
+    )
+
+
+def index_post(post: Post) -> None:
+    """Refreshes the SQLite FTS5 row of `post`."""
+
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM post_post_fts WHERE rowid = %s", [post.pk])
+        cursor.execute(
+            "INSERT INTO post_post_fts(rowid, content) VALUES (%s, %s)",
+            [post.pk, post.content],
+        )
+
+
+def unindex_post(post_id: int) -> None:
+    """Drops the SQLite FTS5 row of a deleted post."""
+
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM post_post_fts WHERE rowid = %s", [post_id])
+
+
+def rebuild_post_index() -> None:
+    """Reindexes all posts after bulk writes that bypassed signals."""
+
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM post_post_fts")
+        cursor.execute(
+            "INSERT INTO post_post_fts(rowid, content) "
+            "SELECT id, content FROM post_post"
+        )
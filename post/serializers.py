@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
-from post.models import Post, Commentary
+from post.models import Post, Commentary, Hashtag
+from social_media_api import images
 
 
 class CommentarySerializer(serializers.ModelSerializer):
@@ -21,6 +23,14 @@ class CommentarySerializer(serializers.ModelSerializer):
         read_only_fields = ("user", "post")
 
 
+class CommentaryBatchSerializer(serializers.Serializer):
+    commentaries = CommentarySerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.COMMENT_BATCH_MAX_SIZE,
+    )
+
+
 class CommentaryRemoveSerializer(CommentarySerializer):
     class Meta:
         model = Commentary
@@ -33,6 +43,7 @@ class PostSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="email",
     )
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -41,13 +52,22 @@ class PostSerializer(serializers.ModelSerializer):
             "create_date",
             "content",
             "total_likes",
+            "comments_count",
             "image",
+            "image_width",
+            "image_height",
+            "image_variants",
             "user",
         )
 
+    def get_image_variants(self, obj: Post) -> dict[str, dict[str, str]]:
+        return images.variant_urls(obj, "image", self.context.get("request"))
+
 
 class PostListSerializer(PostSerializer):
-    commentaries = CommentarySerializer(many=True, read_only=True)
+    commentaries = CommentarySerializer(
+        many=True, read_only=True, source="latest_commentaries"
+    )
 
     class Meta:
         model = Post
@@ -56,7 +76,11 @@ class PostListSerializer(PostSerializer):
             "create_date",
             "content",
             "total_likes",
+            "comments_count",
             "image",
+            "image_width",
+            "image_height",
+            "image_variants",
             "user",
             "commentaries",
         )
@@ -66,3 +90,9 @@ class LikePostSerializer(PostSerializer):
     class Meta:
         model = Post
         fields = ("id",)
+
+
+class HashtagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hashtag
+        fields = ("id", "name", "posts_count")
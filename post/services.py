@@ -1,23 +1,265 @@
+from typing import Iterable, NamedTuple, Optional
+
 from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 
+from social_media_api.cache import bump_version
 from user.models import User
-from .models import Like, Post
+from . import timeline
+from .models import Commentary, Like, Post
+
+
+class LikeState(NamedTuple):
+    liked: bool
+    likes_count: int
+
+
+# PostgreSQL applies a like toggle and reads the new counter in a single
+# statement; the unique_like constraint makes concurrent toggles idempotent.
+# `target` is empty unless the post is visible to the user, as in
+# `timeline.visible_to`.
+PG_LIKE_SQL = """
+WITH target AS (
+    SELECT id FROM post_post
+    WHERE id = %(post)s
+        AND deleted_at IS NULL
+        AND (
+            user_id = %(user)s
+            OR user_id IN (
+                SELECT following_user_id_id FROM user_userfollowing
+                WHERE user_id_id = %(user)s
+            )
+        )
+), inserted AS (
+    INSERT INTO post_like (user_id, content_type_id, object_id, created)
+    SELECT %(user)s, %(content_type)s, id, now() FROM target
+    ON CONFLICT (user_id, content_type_id, object_id) DO NOTHING
+    RETURNING object_id
+), counted AS (
+    UPDATE post_post SET likes_count = likes_count + 1
+    WHERE id IN (SELECT object_id FROM inserted)
+    RETURNING likes_count
+)
+SELECT COALESCE(
+    (SELECT likes_count FROM counted),
+    (SELECT likes_count FROM post_post WHERE id = %(post)s)
+)
+FROM target
+"""
+
+PG_UNLIKE_SQL = """
+WITH target AS (
+    SELECT id FROM post_post
+    WHERE id = %(post)s
+        AND deleted_at IS NULL
+        AND (
+            user_id = %(user)s
+            OR user_id IN (
+                SELECT following_user_id_id FROM user_userfollowing
+                WHERE user_id_id = %(user)s
+            )
+        )
+), deleted AS (
+    DELETE FROM post_like
+    WHERE user_id = %(user)s
+        AND content_type_id = %(content_type)s
+        AND object_id IN (SELECT id FROM target)
+    RETURNING object_id
+), counted AS (
+    UPDATE post_post SET likes_count = GREATEST(likes_count - 1, 0)
+    WHERE id IN (SELECT object_id FROM deleted)
+    RETURNING likes_count
+)
+SELECT COALESCE(
+    (SELECT likes_count FROM counted),
+    (SELECT likes_count FROM post_post WHERE id = %(post)s)
+)
+FROM target
+"""
+
+
+def _toggle_in_one_statement(
+    sql: str, post_id: int, user: User, liked: bool
+) -> Optional[LikeState]:
+    params = {
+        "post": post_id,
+        "user": user.pk,
+        "content_type": ContentType.objects.get_for_model(Post).pk,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
 
+    # the statement bypasses model signals
+    bump_version("post", post_id)
+    return LikeState(liked=liked, likes_count=row[0])
 
-def add_like(obj: Post, user: User) -> Like:
-    """Likes `obj`."""
 
-    obj_type = ContentType.objects.get_for_model(obj)
-    like, is_created = Like.objects.get_or_create(
-        content_type=obj_type, object_id=obj.id, user=user
+def _likes_count(post_id: int) -> int:
+    return (
+        Post.objects.filter(pk=post_id)
+        .values_list("likes_count", flat=True)
+        .get()
     )
-    return like
 
 
-def remove_like(obj: Post, user: User) -> None:
-    """Deletes like from `obj`."""
+def _visible(post_id: int, user: User) -> QuerySet[Post]:
+    return timeline.visible_to(user).filter(pk=post_id)
+
+
+def add_like(post_id: int, user: User) -> Optional[LikeState]:
+    """Likes the post, returns the new state or None for posts unknown
+    or not visible to `user`."""
+
+    if connection.vendor == "postgresql":
+        return _toggle_in_one_statement(PG_LIKE_SQL, post_id, user, True)
+
+    # write first, so that the transaction never upgrades a read lock
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Like.objects.create(
+                    content_type=ContentType.objects.get_for_model(Post),
+                    object_id=post_id,
+                    user=user,
+                )
+            created = 1
+        except IntegrityError:
+            created = 0
+        if not _visible(post_id, user).update(
+            likes_count=F("likes_count") + created
+        ):
+            transaction.set_rollback(True)
+            return None
+        return LikeState(liked=True, likes_count=_likes_count(post_id))
+
+
+def remove_like(post_id: int, user: User) -> Optional[LikeState]:
+    """Unlikes the post, returns the new state or None for posts unknown
+    or not visible to `user`."""
+
+    if connection.vendor == "postgresql":
+        return _toggle_in_one_statement(PG_UNLIKE_SQL, post_id, user, False)
+
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id=post_id,
+            user=user,
+        ).delete()
+        if not _visible(post_id, user).update(
+            likes_count=Greatest(F("likes_count") - deleted, 0)
+        ):
+            transaction.set_rollback(True)
+            return None
+        return LikeState(liked=False, likes_count=_likes_count(post_id))
+
+
+def add_commentary(post: Post, user: User, commentary: str) -> Commentary:
+    """Comments `post` and bumps its comments counter."""
+
+    with transaction.atomic():
+        comm = Commentary.objects.create(
+            commentary=commentary, post=post, user=user
+        )
+        Post.objects.filter(pk=post.pk).update(
+            comments_count=F("comments_count") + 1
+        )
+    return comm
+
+
+def add_commentaries(
+    post: Post, user: User, commentaries: list[str]
+) -> list[Commentary]:
+    """Comments `post` many times with a single INSERT.
+
+    `bulk_create` sends no `post_save`, so the cached post responses are
+    invalidated here instead of by the signal receivers.
+    """
+
+    with transaction.atomic():
+        created = Commentary.objects.bulk_create(
+            [
+                Commentary(commentary=commentary, post=post, user=user)
+                for commentary in commentaries
+            ]
+        )
+        Post.objects.filter(pk=post.pk).update(
+            comments_count=F("comments_count") + len(created)
+        )
+    bump_version("post", post.pk)
+    return created
+
+
+def remove_commentaries(post: Post, user: User) -> int:
+    """Deletes all commentaries of `user` under `post`."""
+
+    with transaction.atomic():
+        deleted, _ = Commentary.objects.filter(post=post, user=user).delete()
+        if deleted:
+            Post.objects.filter(pk=post.pk).update(
+                comments_count=Greatest(F("comments_count") - deleted, 0)
+            )
+    return deleted
+
+
+def refresh_post_counters(
+    post_ids: Optional[Iterable[int]] = None, batch_size: int = 1000
+) -> int:
+    """Recomputes `likes_count`/`comments_count` from the source tables.
+
+    Posts are processed in primary key ranges of `batch_size`, each range
+    being a single UPDATE, so locks are held only for a bounded number of
+    rows. Returns the number of posts that had drifted.
+    """
+
+    post_type = ContentType.objects.get_for_model(Post)
+    likes = (
+        Like.objects.filter(content_type=post_type, object_id=OuterRef("pk"))
+        .order_by()
+        .values("object_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    comments = (
+        Commentary.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    queryset = Post.objects.order_by("pk")
+    if post_ids is not None:
+        queryset = queryset.filter(pk__in=list(post_ids))
 
-    obj_type = ContentType.objects.get_for_model(obj)
-    Like.objects.filter(
-        content_type=obj_type, object_id=obj.id, user=user
-    ).delete()
+    fixed = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).values_list("pk", flat=True)[
+                :batch_size
+            ]
+        )
+        if not pks:
+            return fixed
+        last_pk = pks[-1]
+        drifted = (
+            Post.objects.filter(pk__in=pks)
+            .annotate(
+                actual_likes=Coalesce(Subquery(likes), Value(0)),
+                actual_comments=Coalesce(Subquery(comments), Value(0)),
+            )
+            .exclude(
+                likes_count=F("actual_likes"),
+                comments_count=F("actual_comments"),
+            )
+            .values_list("pk", flat=True)
+        )
+        fixed += Post.objects.filter(pk__in=list(drifted)).update(
+            likes_count=Coalesce(Subquery(likes), Value(0)),
+            comments_count=Coalesce(Subquery(comments), Value(0)),
+        )
@@ -0,0 +1,134 @@
+from typing import Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from post import hashtags, search, timeline
+from post.models import Commentary, Like, Post
+from social_media_api import images
+from social_media_api.cache import bump_version
+from user.models import User
+from user.signals import followings_created, followings_deleted
+
+
+@receiver(post_save, sender=Post)
+def deliver_post(
+    sender: type, instance: Post, created: bool, **kwargs: dict
+) -> None:
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def process_image(sender: type, instance: Post, **kwargs: dict) -> None:
+    images.schedule_variants(instance, "image")
+
+
+@receiver(post_save, sender=Post)
+def index_hashtags(
+    sender: type,
+    instance: Post,
+    update_fields: Optional[frozenset] = None,
+    **kwargs: dict,
+) -> None:
+    if update_fields is None or "content" in update_fields:
+        hashtags.sync_post_hashtags(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_content(
+    sender: type,
+    instance: Post,
+    update_fields: Optional[frozenset] = None,
+    **kwargs: dict,
+) -> None:
+    if update_fields is None or "content" in update_fields:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_content(sender: type, instance: Post, **kwargs: dict) -> None:
+    search.unindex_post(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def unlink_hashtags(sender: type, instance: Post, **kwargs: dict) -> None:
+    hashtags.unlink_post_hashtags(instance)
+
+
+@receiver(followings_created)
+def backfill_timeline(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    timeline.backfill_followings(user_id, following_ids)
+
+
+@receiver(followings_deleted)
+def trim_timeline(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    timeline.trim_followings(user_id, following_ids)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender: type, instance: Post, **kwargs: dict) -> None:
+    bump_version("post", instance.pk)
+
+
+@receiver(post_save, sender=Commentary)
+@receiver(post_delete, sender=Commentary)
+def invalidate_commented_post(
+    sender: type, instance: Commentary, **kwargs: dict
+) -> None:
+    bump_version("post", instance.post_id)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def invalidate_liked_post(
+    sender: type, instance: Like, **kwargs: dict
+) -> None:
+    content_type = ContentType.objects.get_for_id(instance.content_type_id)
+    if content_type.model_class() is Post:
+        bump_version("post", instance.object_id)
+
+
+@receiver(pre_save, sender=User)
+def check_author_email(
+    sender: type,
+    instance: User,
+    update_fields: Optional[frozenset] = None,
+    **kwargs: dict,
+) -> None:
+    instance._email_changed = (
+        instance.pk is not None
+        and (update_fields is None or "email" in update_fields)
+        and not User.objects.filter(
+            pk=instance.pk, email=instance.email
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_authored_posts(
+    sender: type, instance: User, **kwargs: dict
+) -> None:
+    # cached post payloads show the emails of the author and commenters
+    if not getattr(instance, "_email_changed", False):
+        return
+    post_ids = set(
+        Post.objects.filter(user=instance).values_list("pk", flat=True)
+    ) | set(
+        Commentary.objects.filter(user=instance).values_list(
+            "post_id", flat=True
+        )
+    )
+    for post_id in post_ids:
+        bump_version("post", post_id)
@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from post.models import Commentary, Post
+
+POSTS_URL = reverse("posts:post-list")
+ASYNC_POSTS_URL = reverse("posts:async-post-list")
+
+
+class AsyncReadViewsTests(TestCase):
+    def setUp(self) -> None:
+        caches["auth"].clear()
+        self.user = get_user_model().objects.create_user(
+            email="async@gmail.com",
+            nickname="async",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.posts = [
+            Post.objects.create(content=f"post {index}", user=self.user)
+            for index in range(3)
+        ]
+        Commentary.objects.create(
+            commentary="first", post=self.posts[0], user=self.user
+        )
+        self.headers = {
+            "AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+    async def test_feed_matches_sync_feed(self) -> None:
+        response = await self.async_client.get(
+            ASYNC_POSTS_URL, headers=self.headers
+        )
+        expected = await sync_to_async(self.sync_client.get)(POSTS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"], expected.json()["results"]
+        )
+
+    async def test_feed_cursor_pagination(self) -> None:
+        first = await self.async_client.get(
+            ASYNC_POSTS_URL, {"page_size": 2}, headers=self.headers
+        )
+        second = await self.async_client.get(
+            first.json()["next"], headers=self.headers
+        )
+
+        self.assertEqual(
+            [post["id"] for post in first.json()["results"]]
+            + [post["id"] for post in second.json()["results"]],
+            [post.id for post in reversed(self.posts)],
+        )
+        self.assertIsNone(second.json()["next"])
+
+    async def test_post_and_user_detail(self) -> None:
+        post = await self.async_client.get(
+            reverse(
+                "posts:async-post-detail", kwargs={"pk": self.posts[0].id}
+            ),
+            headers=self.headers,
+        )
+        user = await self.async_client.get(
+            reverse("users:async-retrieve", kwargs={"pk": self.user.id}),
+            headers=self.headers,
+        )
+        missing = await self.async_client.get(
+            reverse("posts:async-post-detail", kwargs={"pk": 0}),
+            headers=self.headers,
+        )
+
+        self.assertEqual(post.json()["commentaries"][0]["commentary"], "first")
+        self.assertEqual(user.json()["nickname"], "async")
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_authentication_required(self) -> None:
+        response = await self.async_client.get(ASYNC_POSTS_URL)
+        forged = await self.async_client.get(
+            ASYNC_POSTS_URL,
+            headers={"AUTHORIZATION": self.headers["AUTHORIZATION"] + "x"},
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(forged.status_code, 401)
@@ -0,0 +1,131 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from post import services
+from post.models import Post
+from social_media_api.cache import (
+    cached_response,
+    get_versions,
+    stats as cache_stats,
+)
+
+STATS_URL = reverse("cache-stats")
+
+
+def detail_post_url(post_id: int) -> str:
+    return reverse("posts:post-detail", kwargs={"pk": post_id})
+
+
+class PostResponseCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="reader@gmail.com",
+            nickname="reader",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(content="cached", user=self.user)
+
+    def test_second_read_is_served_from_cache(self) -> None:
+        first = self.client.get(detail_post_url(self.post.id))
+        with self.assertNumQueries(0):
+            second = self.client.get(detail_post_url(self.post.id))
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+    def test_writes_invalidate_cached_post(self) -> None:
+        url = detail_post_url(self.post.id)
+        self.client.get(url)
+
+        self.client.post(
+            reverse("posts:post-comment", kwargs={"pk": self.post.id}),
+            {"commentary": "fresh"},
+        )
+        after_comment = self.client.get(url)
+        self.client.post(
+            reverse("posts:post-like", kwargs={"pk": self.post.id})
+        )
+        after_like = self.client.get(url)
+
+        self.assertEqual(after_comment["X-Cache"], "MISS")
+        self.assertEqual(after_comment.data["comments_count"], 1)
+        self.assertEqual(after_like["X-Cache"], "MISS")
+        self.assertEqual(after_like.data["total_likes"], 1)
+
+    def test_email_changes_invalidate_cached_posts(self) -> None:
+        author = get_user_model().objects.create_user(
+            email="author@gmail.com",
+            nickname="author",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        other = Post.objects.create(content="commented", user=author)
+        services.add_commentary(other, self.user, "mine")
+        objects = [("post", self.post.id), ("post", other.id)]
+        versions = get_versions(*objects)
+
+        self.client.patch(reverse("users:manage"), {"nickname": "renamed"})
+        self.assertEqual(get_versions(*objects), versions)
+        self.client.patch(reverse("users:manage"), {"email": "new@gmail.com"})
+        changed = get_versions(*objects)
+
+        self.assertNotEqual(changed[0], versions[0])
+        self.assertNotEqual(changed[1], versions[1])
+
+    def test_stats_are_shown_to_staff(self) -> None:
+        url = detail_post_url(self.post.id)
+        before = cache_stats().get("post", {})
+        self.client.get(url)
+        self.client.get(url)
+
+        forbidden = self.client.get(STATS_URL)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(STATS_URL)
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data["kinds"]["post"]["hit"], before.get("hit", 0) + 1
+        )
+        self.assertEqual(
+            response.data["kinds"]["post"]["miss"],
+            before.get("miss", 0) + 1,
+        )
+
+    def test_single_flight_recompute(self) -> None:
+        computing = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_compute() -> dict:
+            calls.append(1)
+            computing.set()
+            release.wait(5)
+            return {"id": self.post.id}
+
+        leader = threading.Thread(
+            target=cached_response,
+            args=("post", self.post.id, self.user.id, slow_compute),
+        )
+        leader.start()
+        computing.wait(5)
+        threading.Timer(0.05, release.set).start()
+        payload, hit = cached_response(
+            "post", self.post.id, self.user.id, slow_compute
+        )
+        leader.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(hit)
+        self.assertEqual(payload, {"id": self.post.id})
@@ -0,0 +1,183 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from post import services
+from post.models import (
+    Commentary,
+    DeletionJob,
+    Hashtag,
+    Like,
+    Post,
+    PostHashtag,
+    TimelineEntry,
+)
+from social_media_api.cache import get_versions
+from user.models import UserFollowing
+
+POSTS_URL = reverse("posts:post-list")
+MANAGE_URL = reverse("users:manage")
+
+
+@override_settings(DELETION_CHUNK_SIZE=2)
+class DeletionTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="leaving@gmail.com",
+            nickname="leaving",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.friend = get_user_model().objects.create_user(
+            email="staying@gmail.com",
+            nickname="staying",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        UserFollowing.objects.create(
+            user_id=self.friend, following_user_id=self.user
+        )
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.friend
+        )
+        self.posts = [
+            Post.objects.create(content=f"#bye {index}", user=self.user)
+            for index in range(3)
+        ]
+        self.friend_post = Post.objects.create(content="hi", user=self.friend)
+        for post in self.posts + [self.friend_post]:
+            services.add_like(post.pk, self.user)
+            services.add_like(post.pk, self.friend)
+            services.add_commentary(post, self.user, "from leaving")
+            services.add_commentary(post, self.friend, "from staying")
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def drain(self) -> None:
+        call_command("drain_deletion_queue", stdout=StringIO())
+
+    def test_post_is_hidden_then_purged(self) -> None:
+        post = self.posts[0]
+        url = reverse("posts:post-detail", args=[post.pk])
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertNotIn(
+            post.pk,
+            [row["id"] for row in self.client.get(POSTS_URL).data["results"]],
+        )
+        self.assertIsNone(services.add_like(post.pk, self.friend))
+        self.assertTrue(Commentary.objects.filter(post=post).exists())
+
+        self.drain()
+
+        job = DeletionJob.objects.get()
+        self.assertEqual(job.status, DeletionJob.Status.DONE)
+        self.assertEqual(job.deleted_rows, 2 + 2 + 2 + 1 + 1)
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertFalse(Like.objects.filter(object_id=post.pk).exists())
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(Hashtag.objects.get(name="bye").posts_count, 2)
+
+    def test_account_with_posts_is_deactivated_then_purged(self) -> None:
+        self.assertEqual(self.client.delete(MANAGE_URL).status_code, 204)
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        token_client = APIClient()
+        token_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.assertEqual(token_client.get(POSTS_URL).status_code, 401)
+        friend_client = APIClient()
+        friend_client.force_authenticate(self.friend)
+        self.assertEqual(
+            friend_client.get(
+                reverse("users:retrieve", args=[self.user.pk])
+            ).status_code,
+            404,
+        )
+
+        self.drain()
+
+        self.assertEqual(
+            DeletionJob.objects.get().status, DeletionJob.Status.DONE
+        )
+        self.assertFalse(
+            get_user_model().objects.filter(pk=self.user.pk).exists()
+        )
+        self.assertFalse(Post.all_objects.filter(user=self.user.pk).exists())
+        self.assertFalse(PostHashtag.objects.exists())
+        self.friend.refresh_from_db()
+        self.assertEqual(
+            (self.friend.followers_count, self.friend.following_count),
+            (0, 0),
+        )
+        self.friend_post.refresh_from_db()
+        self.assertEqual(
+            (self.friend_post.likes_count, self.friend_post.comments_count),
+            (1, 1),
+        )
+        self.assertEqual(services.refresh_post_counters(), 0)
+
+    def test_account_is_hidden_before_the_purge(self) -> None:
+        versions = get_versions(*(("post", post.pk) for post in self.posts))
+
+        self.assertEqual(self.client.delete(MANAGE_URL).status_code, 204)
+
+        for post, version in zip(self.posts, versions):
+            self.assertNotEqual(get_versions(("post", post.pk)), [version])
+
+        friend_client = APIClient()
+        friend_client.force_authenticate(self.friend)
+        feed = friend_client.get(POSTS_URL).data["results"]
+        self.assertEqual([row["id"] for row in feed], [self.friend_post.pk])
+        for url, params in (
+            (reverse("posts:post-search"), {"q": "bye"}),
+            (reverse("posts:hashtag-posts", kwargs={"name": "bye"}), {}),
+        ):
+            with self.subTest(url):
+                response = friend_client.get(url, params)
+                self.assertEqual(response.data["results"], [])
+        for name in ("users:followers", "users:following"):
+            with self.subTest(name):
+                response = friend_client.get(
+                    reverse(name, args=[self.friend.pk])
+                )
+                self.assertEqual(response.data["results"], [])
+        response = friend_client.post(
+            reverse("users:following-list-bulk-follow"),
+            {"users": [self.user.email]},
+            format="json",
+        )
+        self.assertEqual(response.data[0]["status"], "not_found")
+        self.assertFalse(
+            DeletionJob.objects.exclude(status="pending").exists()
+        )
+
+    def test_failed_job_is_requeued(self) -> None:
+        self.client.delete(
+            reverse("posts:post-detail", args=[self.posts[0].pk])
+        )
+
+        with mock.patch(
+            "post.deletion._Purge.post", side_effect=RuntimeError("boom")
+        ), self.assertLogs("post.deletion", "ERROR"):
+            self.drain()
+        job = DeletionJob.objects.get()
+        self.assertEqual(job.status, DeletionJob.Status.FAILED)
+        self.assertIn("boom", job.error)
+
+        call_command("drain_deletion_queue", requeue=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, DeletionJob.Status.DONE)
+        self.assertFalse(Post.all_objects.filter(pk=self.posts[0].pk).exists())
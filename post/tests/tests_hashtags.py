@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from post.hashtags import extract_hashtags
+from post.models import Hashtag, Post, PostHashtag
+from user.models import UserFollowing
+
+POSTS_URL = reverse("posts:post-list")
+
+
+def hashtag_posts_url(name: str) -> str:
+    return reverse("posts:hashtag-posts", kwargs={"name": name})
+
+
+class HashtagTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="tagger@gmail.com",
+            nickname="tagger",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_extract_hashtags(self) -> None:
+        self.assertEqual(
+            extract_hashtags("Hello #World and #world, #Django_4!"),
+            {"world", "django_4"},
+        )
+
+    def test_filter_feed_by_hashtag(self) -> None:
+        tagged = Post.objects.create(content="about #python", user=self.user)
+        Post.objects.create(content="pythonic but untagged", user=self.user)
+
+        response = self.client.get(POSTS_URL, {"hashtag": "#Python"})
+
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]], [tagged.id]
+        )
+
+    def test_hashtags_follow_content_changes(self) -> None:
+        post = Post.objects.create(content="#one #two", user=self.user)
+        post.content = "#two #three"
+        post.save()
+
+        self.assertEqual(
+            set(post.hashtags.values_list("name", flat=True)), {"two", "three"}
+        )
+        self.assertEqual(
+            dict(Hashtag.objects.values_list("name", "posts_count")),
+            {"one": 0, "two": 1, "three": 1},
+        )
+
+        post.delete()
+        self.assertEqual(Hashtag.objects.get(name="two").posts_count, 0)
+
+    def test_hashtag_posts_endpoint(self) -> None:
+        first = Post.objects.create(content="#news first", user=self.user)
+        second = Post.objects.create(content="#news second", user=self.user)
+
+        tag = self.client.get(
+            reverse("posts:hashtag-detail", kwargs={"name": "NEWS"})
+        )
+        response = self.client.get(hashtag_posts_url("news"))
+
+        self.assertEqual(tag.data["posts_count"], 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]],
+            [second.id, first.id],
+        )
+
+    def test_hashtag_posts_are_limited_to_visible_posts(self) -> None:
+        author = get_user_model().objects.create_user(
+            email="author@gmail.com",
+            nickname="author",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        post = Post.objects.create(content="#news hidden", user=author)
+        hidden = self.client.get(hashtag_posts_url("news"))
+
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=author
+        )
+        followed = self.client.get(hashtag_posts_url("news"))
+
+        self.assertEqual(hidden.data["results"], [])
+        self.assertEqual(
+            [row["id"] for row in followed.data["results"]], [post.id]
+        )
+
+    def test_backfill_hashtags_command(self) -> None:
+        post = Post.objects.create(content="#legacy post", user=self.user)
+        PostHashtag.objects.all().delete()
+        Hashtag.objects.all().delete()
+
+        call_command("backfill_hashtags", stdout=StringIO())
+
+        self.assertEqual(Hashtag.objects.get(name="legacy").posts_count, 1)
+        self.assertTrue(post.hashtags.filter(name="legacy").exists())
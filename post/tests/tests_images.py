@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from post.models import Post
+from social_media_api.images import render_variants
+
+POSTS_URL = reverse("posts:post-list")
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_with_exif(width: int, height: int) -> SimpleUploadedFile:
+    image = Image.new("RGB", (width, height), "red")
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"  # Make
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    return SimpleUploadedFile(
+        "photo.jpg", buffer.getvalue(), content_type="image/jpeg"
+    )
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_PIPELINE_WORKERS=0,
+    IMAGE_VARIANTS={"thumbnail": 50, "medium": 200},
+)
+class ImagePipelineTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="photographer@gmail.com",
+            nickname="photographer",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client.force_authenticate(self.user)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_upload_renders_variants(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                POSTS_URL,
+                {"content": "sunset", "image": jpeg_with_exif(400, 300)},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        post = Post.objects.get(pk=response.data["id"])
+        self.assertEqual((post.image_width, post.image_height), (400, 300))
+        self.assertEqual(post.image_variants["source"], post.image.name)
+        with Image.open(post.image.path) as original:
+            self.assertEqual(len(original.getexif()), 0)
+
+        for name, size in (("thumbnail", 50), ("medium", 200)):
+            for variant_format in ("original", "webp"):
+                path = os.path.join(
+                    MEDIA_ROOT, post.image_variants[name][variant_format]
+                )
+                with Image.open(path) as variant:
+                    self.assertEqual(max(variant.size), size)
+
+        detail = self.client.get(
+            reverse("posts:post-detail", kwargs={"pk": post.id})
+        )
+        urls = detail.data["image_variants"]
+        self.assertEqual(set(urls), {"thumbnail", "medium"})
+        self.assertTrue(urls["thumbnail"]["webp"].startswith("http"))
+        self.assertTrue(urls["thumbnail"]["webp"].endswith(".webp"))
+
+    def test_editing_content_keeps_variants(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(
+                content="sunset", user=self.user, image=jpeg_with_exif(80, 60)
+            )
+        post.refresh_from_db()
+        variants = post.image_variants
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            post.content = "sunrise"
+            post.save()
+
+        self.assertEqual(callbacks, [])
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants, variants)
+
+    def test_profile_image_variants(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_image = jpeg_with_exif(300, 600)
+            self.user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(
+            (self.user.profile_image_width, self.user.profile_image_height),
+            (300, 600),
+        )
+        self.assertIn("medium", self.user.profile_image_variants)
+
+    def test_webp_variants_of_cmyk_and_transparent_images(self) -> None:
+        cmyk_path = os.path.join(MEDIA_ROOT, "cmyk.jpg")
+        Image.new("CMYK", (80, 60), (0, 255, 255, 0)).save(cmyk_path)
+        palette_path = os.path.join(MEDIA_ROOT, "palette.png")
+        palette = Image.new("P", (80, 60), 0)
+        palette.save(palette_path, transparency=0)
+
+        for path, mode in ((cmyk_path, "RGB"), (palette_path, "RGBA")):
+            result = render_variants(path, {"thumbnail": 50}, quality=85)
+            webp_path = os.path.join(
+                MEDIA_ROOT, result["variants"]["thumbnail"]["webp"]
+            )
+            with Image.open(webp_path) as variant:
+                self.assertEqual(variant.mode, mode)
@@ -0,0 +1,85 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from post.models import Post
+from social_media_api.middleware import fingerprint, set_enabled
+
+POSTS_URL = reverse("posts:post-list")
+ASYNC_POSTS_URL = reverse("posts:async-post-list")
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        set_enabled(None)
+        self.user = get_user_model().objects.create_user(
+            email="staff@gmail.com",
+            nickname="staff",
+            date_of_birth="2012-01-01",
+            password="test1",
+            is_staff=True,
+        )
+        Post.objects.create(content="post", user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_for_staff(self) -> None:
+        response = self.client.get(POSTS_URL)
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('view;desc="posts:post-list"', timing)
+        self.assertIn("slowest;dur=", timing)
+
+    def test_no_server_timing_for_other_users(self) -> None:
+        self.user.is_staff = False
+        self.user.save()
+        self.client.force_authenticate(self.user)
+
+        self.assertNotIn("Server-Timing", self.client.get(POSTS_URL))
+
+    async def test_async_views_are_instrumented(self) -> None:
+        response = await self.async_client.get(
+            ASYNC_POSTS_URL,
+            headers={
+                "AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"
+            },
+        )
+
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+    @override_settings(REQUEST_BUDGET_QUERIES=0)
+    def test_requests_over_budget_are_logged(self) -> None:
+        with self.assertLogs("social_media_api.middleware", "WARNING") as log:
+            self.client.get(POSTS_URL)
+
+        self.assertIn("GET /api/media/posts/ (posts:post-list)", log.output[0])
+
+    @mock.patch("social_media_api.cache.is_shared", return_value=True)
+    def test_switched_off_at_runtime(self, is_shared: mock.Mock) -> None:
+        call_command("request_instrumentation", "off", stdout=StringIO())
+        self.assertNotIn("Server-Timing", self.client.get(POSTS_URL))
+
+        call_command("request_instrumentation", "default", stdout=StringIO())
+        self.assertIn("Server-Timing", self.client.get(POSTS_URL))
+
+    def test_switch_needs_a_shared_cache(self) -> None:
+        with self.assertRaisesMessage(CommandError, "CACHE_URL"):
+            call_command("request_instrumentation", "off", stdout=StringIO())
+
+    def test_fingerprint_collapses_literals(self) -> None:
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = 'a'\n"
+                "LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
@@ -0,0 +1,150 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from post import like_buffer
+from post.models import Like, Post
+from user.models import UserFollowing
+
+
+def like_url(post_id: int) -> str:
+    return reverse("posts:post-like", args=[post_id])
+
+
+def unlike_url(post_id: int) -> str:
+    return reverse("posts:post-unlike", args=[post_id])
+
+
+@override_settings(LIKE_WRITE_BEHIND=True, LIKE_FLUSH_INTERVAL=0)
+class LikeBufferTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        like_buffer.buffer = like_buffer.LikeBuffer()
+        self.user = get_user_model().objects.create_user(
+            email="fan@gmail.com",
+            nickname="fan",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.other = get_user_model().objects.create_user(
+            email="other@gmail.com",
+            nickname="other",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.other
+        )
+        self.post = Post.objects.create(content="viral", user=self.other)
+        Like.objects.create(content_object=self.post, user=self.other)
+        Post.objects.filter(pk=self.post.pk).update(likes_count=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_toggles_are_answered_from_the_buffer(self) -> None:
+        response = self.client.post(like_url(self.post.pk))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"liked": True, "likes_count": 2})
+        self.assertFalse(Like.objects.filter(user=self.user).exists())
+
+        for _ in range(3):
+            self.client.post(unlike_url(self.post.pk))
+            response = self.client.post(like_url(self.post.pk))
+        self.assertEqual(response.data, {"liked": True, "likes_count": 2})
+
+        response = self.client.post(unlike_url(self.post.pk))
+        self.assertEqual(response.data, {"liked": False, "likes_count": 1})
+
+    def test_flush_writes_the_last_toggle_of_each_pair(self) -> None:
+        self.client.post(like_url(self.post.pk))
+        other_client = APIClient()
+        other_client.force_authenticate(self.other)
+        other_client.post(unlike_url(self.post.pk))
+
+        self.assertEqual(like_buffer.flush(), 2)
+
+        self.assertEqual(
+            list(Like.objects.values_list("user", flat=True)), [self.user.pk]
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertEqual(like_buffer.flush(), 0)
+
+        response = self.client.post(like_url(self.post.pk))
+        self.assertEqual(response.data, {"liked": True, "likes_count": 1})
+
+    def test_unknown_posts_are_not_found(self) -> None:
+        self.assertEqual(self.client.post(like_url(0)).status_code, 404)
+
+    def test_posts_not_visible_are_not_found(self) -> None:
+        stranger = get_user_model().objects.create_user(
+            email="stranger@gmail.com",
+            nickname="stranger",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        post = Post.objects.create(content="hidden", user=stranger)
+
+        self.assertEqual(self.client.post(like_url(post.pk)).status_code, 404)
+        self.assertEqual(like_buffer.flush(), 0)
+
+    def test_failed_flush_is_retried(self) -> None:
+        self.client.post(like_url(self.post.pk))
+
+        with mock.patch.object(
+            like_buffer.LikeBuffer,
+            "_write",
+            side_effect=RuntimeError("boom"),
+        ), self.assertLogs("post.like_buffer", "ERROR"):
+            with self.assertRaises(RuntimeError):
+                like_buffer.flush()
+        self.client.post(unlike_url(self.post.pk))
+        self.client.post(like_url(self.post.pk))
+
+        self.assertEqual(like_buffer.flush(), 1)
+        self.assertTrue(Like.objects.filter(user=self.user).exists())
+
+    def test_flush_keeps_concurrent_counter_changes(self) -> None:
+        self.client.post(like_url(self.post.pk))
+        # written meanwhile by another worker and by a new comment
+        third = get_user_model().objects.create_user(
+            email="third@gmail.com",
+            nickname="third",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        Like.objects.create(content_object=self.post, user=third)
+        Like.objects.create(content_object=self.post, user=self.user)
+        Post.objects.filter(pk=self.post.pk).update(
+            likes_count=F("likes_count") + 2,
+            comments_count=F("comments_count") + 1,
+        )
+
+        self.assertEqual(like_buffer.flush(), 1)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 3)
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_toggles_of_deleted_accounts_are_dropped(self) -> None:
+        self.client.post(like_url(self.post.pk))
+        other_client = APIClient()
+        other_client.force_authenticate(self.other)
+        other_client.post(unlike_url(self.post.pk))
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            deleted_at=timezone.now()
+        )
+
+        self.assertEqual(like_buffer.flush(), 1)
+
+        self.assertFalse(Like.objects.exists())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+        self.assertEqual(like_buffer.flush(), 0)
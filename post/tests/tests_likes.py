@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from post.models import Like, Post
+from user.models import User, UserFollowing
+
+THREADS = 8
+REQUESTS_PER_THREAD = 5
+
+
+def like_url(post_id: int) -> str:
+    return reverse("posts:post-like", kwargs={"pk": post_id})
+
+
+def unlike_url(post_id: int) -> str:
+    return reverse("posts:post-unlike", kwargs={"pk": post_id})
+
+
+def create_user(index: int) -> User:
+    return get_user_model().objects.create_user(
+        email=f"liker{index}@gmail.com",
+        nickname=f"liker{index}",
+        date_of_birth="2012-01-01",
+        password="test1",
+    )
+
+
+class LikeStateTests(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user(0)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(content="likeable", user=self.user)
+
+    def test_like_returns_state_and_count(self) -> None:
+        first = self.client.post(like_url(self.post.id))
+        second = self.client.post(like_url(self.post.id))
+        removed = self.client.post(unlike_url(self.post.id))
+
+        self.assertEqual(first.data, {"liked": True, "likes_count": 1})
+        self.assertEqual(second.data, {"liked": True, "likes_count": 1})
+        self.assertEqual(removed.data, {"liked": False, "likes_count": 0})
+
+    def test_like_unknown_post(self) -> None:
+        response = self.client.post(like_url(self.post.id + 100))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Like.objects.exists())
+
+    def test_like_post_not_visible(self) -> None:
+        stranger = create_user(1)
+        post = Post.objects.create(content="hidden", user=stranger)
+        Like.objects.create(content_object=post, user=self.user)
+
+        liked = self.client.post(like_url(post.id))
+        unliked = self.client.post(unlike_url(post.id))
+
+        self.assertEqual(liked.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(unliked.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Like.objects.filter(object_id=post.id).count(), 1)
+
+    def test_like_followed_post(self) -> None:
+        author = create_user(1)
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=author
+        )
+        post = Post.objects.create(content="followed", user=author)
+
+        response = self.client.post(like_url(post.id))
+
+        self.assertEqual(response.data, {"liked": True, "likes_count": 1})
+
+
+class ConcurrentLikeTests(TransactionTestCase):
+    def test_concurrent_double_taps(self) -> None:
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("shared-cache in-memory SQLite fails on lock waits")
+
+        user = create_user(0)
+        post = Post.objects.create(content="viral", user=user)
+        barrier = Barrier(THREADS)
+
+        def double_tap(_: int) -> list[dict]:
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                return [
+                    client.post(like_url(post.id)).data
+                    for _ in range(REQUESTS_PER_THREAD)
+                ]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            results = list(executor.map(double_tap, range(THREADS)))
+
+        self.assertEqual(
+            [data for taps in results for data in taps],
+            [{"liked": True, "likes_count": 1}]
+            * THREADS
+            * REQUESTS_PER_THREAD,
+        )
+        post.refresh_from_db()
+        self.assertEqual(Like.objects.filter(object_id=post.id).count(), 1)
+        self.assertEqual(post.likes_count, 1)
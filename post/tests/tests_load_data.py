@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from post import services
+from post.models import Commentary, Like, Post, TimelineEntry
+from post.timeline import feed_for
+from user.models import UserFollowing
+
+POSTS_URL = reverse("posts:post-list")
+
+
+class GenerateLoadDataTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        call_command(
+            "generate_load_data",
+            users=40,
+            follows=5,
+            posts=3,
+            comments=2,
+            likes=4,
+            batch_size=50,
+            seed=1,
+            stdout=StringIO(),
+        )
+        self.users = get_user_model().objects.order_by("pk")
+
+    def test_rows_are_generated(self) -> None:
+        self.assertEqual(self.users.count(), 40)
+        self.assertTrue(Post.objects.exists())
+        self.assertTrue(Commentary.objects.exists())
+        self.assertTrue(Like.objects.exists())
+        self.assertTrue(self.users.first().check_password("loadtest"))
+
+    def test_counters_match_rows(self) -> None:
+        followings = UserFollowing.objects.count()
+        totals = self.users.aggregate(
+            followers=Sum("followers_count"),
+            following=Sum("following_count"),
+        )
+        self.assertEqual(
+            totals, {"followers": followings, "following": followings}
+        )
+        self.assertEqual(services.refresh_post_counters(), 0)
+
+    def test_timelines_are_filled(self) -> None:
+        user = self.users.filter(following_count__gt=0).first()
+        expected = Post.objects.filter(
+            user_id__in=UserFollowing.objects.filter(user_id=user).values(
+                "following_user_id"
+            )
+        ) | Post.objects.filter(user=user)
+
+        self.assertEqual(
+            set(feed_for(user).values_list("pk", flat=True)),
+            set(expected.values_list("pk", flat=True)),
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(owner=user).count(), expected.count()
+        )
+
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get(POSTS_URL).status_code, 200)
@@ -1,11 +1,20 @@
+from io import StringIO
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from post.models import Post, Commentary
+from post.models import Post, Commentary, Like
 from post.serializers import PostSerializer
+from social_media_api.pagination import KeysetPagination
+from user.models import UserFollowing
 
 POSTS_URL = reverse("posts:post-list")
 
@@ -131,3 +140,241 @@ class AuthenticatedPostApiTests(TestCase):
         response = self.client1.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_like_counters(self) -> None:
+        post = Post.objects.create(
+            content="test123456789123456789123456789", user=self.user1
+        )
+        like_url = reverse("posts:post-like", kwargs={"pk": post.id})
+        unlike_url = reverse("posts:post-unlike", kwargs={"pk": post.id})
+
+        self.client1.post(like_url)
+        self.client1.post(like_url)
+        post.refresh_from_db()
+        self.assertEqual(post.likes_count, 1)
+
+        self.client1.post(unlike_url)
+        self.client1.post(unlike_url)
+        post.refresh_from_db()
+        self.assertEqual(post.likes_count, 0)
+
+    def test_comment_counters(self) -> None:
+        post = Post.objects.create(
+            content="test123456789123456789123456789", user=self.user1
+        )
+        url = reverse("posts:post-comment", kwargs={"pk": post.id})
+        self.client1.post(url, {"commentary": "first"})
+        self.client1.post(url, {"commentary": "second"})
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+
+        self.client1.post(reverse("posts:post-remove", kwargs={"pk": post.id}))
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_list_does_not_count_likes(self) -> None:
+        for _ in range(5):
+            Post.objects.create(content="counted post", user=self.user1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client1.get(POSTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        like_table = Like._meta.db_table
+        self.assertFalse(
+            any(
+                like_table in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_sync_post_counters_command(self) -> None:
+        post = Post.objects.create(content="drifted post", user=self.user1)
+        Like.objects.create(
+            user=self.user2,
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id=post.id,
+        )
+        Commentary.objects.create(
+            commentary="About", post=post, user=self.user2
+        )
+        Post.objects.filter(pk=post.pk).update(likes_count=7, comments_count=0)
+
+        call_command("sync_post_counters", stdout=StringIO())
+        post.refresh_from_db()
+
+        self.assertEqual(post.likes_count, 1)
+        self.assertEqual(post.comments_count, 1)
+
+    def test_liked_posts_ordered_by_like_time(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.user1, following_user_id=self.user2
+        )
+        posts = [
+            Post.objects.create(content=f"post {i}", user=self.user2)
+            for i in range(3)
+        ]
+        for post in (posts[1], posts[0]):
+            self.client1.post(
+                reverse("posts:post-like", kwargs={"pk": post.id})
+            )
+        self.client2.post(
+            reverse("posts:post-like", kwargs={"pk": posts[2].id})
+        )
+
+        response = self.client1.get(reverse("posts:post-liked"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]],
+            [posts[0].id, posts[1].id],
+        )
+
+    def test_liked_posts_query_count_is_constant(self) -> None:
+        url = reverse("posts:post-liked")
+        post_type = ContentType.objects.get_for_model(Post)
+
+        def like_posts(count: int) -> None:
+            for i in range(count):
+                post = Post.objects.create(
+                    content=f"liked {i}", user=self.user2
+                )
+                Like.objects.create(
+                    user=self.user1, content_type=post_type, object_id=post.id
+                )
+
+        like_posts(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client1.get(url)
+        like_posts(15)
+        with CaptureQueriesContext(connection) as many:
+            self.client1.get(url)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_feed_cursor_pagination(self) -> None:
+        created = [
+            Post.objects.create(content=f"page post {i}", user=self.user1).id
+            for i in range(5)
+        ]
+
+        seen = []
+        url = POSTS_URL + "?page_size=2"
+        while url:
+            response = self.client1.get(url)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen.extend(post["id"] for post in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, created[::-1])
+
+    def test_page_size_is_capped(self) -> None:
+        for i in range(5):
+            Post.objects.create(content=f"capped post {i}", user=self.user1)
+
+        with patch.object(KeysetPagination, "max_page_size", 3):
+            response = self.client1.get(POSTS_URL + "?page_size=1000")
+
+        self.assertEqual(len(response.data["results"]), 3)
+
+    @override_settings(POST_EMBEDDED_COMMENTARIES=2)
+    def test_feed_embeds_latest_commentaries_only(self) -> None:
+        post = Post.objects.create(content="discussed post", user=self.user1)
+        url = reverse("posts:post-comment", kwargs={"pk": post.id})
+        for i in range(4):
+            self.client1.post(url, {"commentary": f"comment {i}"})
+
+        response = self.client1.get(detail_post_url(post.id))
+
+        self.assertEqual(response.data["comments_count"], 4)
+        self.assertEqual(
+            [comm["commentary"] for comm in response.data["commentaries"]],
+            ["comment 3", "comment 2"],
+        )
+
+    def test_post_comments_endpoint(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.user2, following_user_id=self.user1
+        )
+        post = Post.objects.create(content="discussed post", user=self.user1)
+        comments = [
+            Commentary.objects.create(
+                commentary=f"comment {i}", post=post, user=self.user1
+            )
+            for i in range(3)
+        ]
+        url = reverse("posts:post-comments", kwargs={"pk": post.id})
+
+        first_page = self.client2.get(url, {"page_size": 2})
+        second_page = self.client2.get(first_page.data["next"])
+
+        self.assertEqual(first_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [comm["id"] for comm in first_page.data["results"]],
+            [comments[2].id, comments[1].id],
+        )
+        self.assertEqual(
+            [comm["id"] for comm in second_page.data["results"]],
+            [comments[0].id],
+        )
+
+    def _commentary_inserts(self, queries: CaptureQueriesContext) -> int:
+        table = Commentary._meta.db_table
+        return sum(
+            query["sql"].startswith(f'INSERT INTO "{table}"')
+            for query in queries.captured_queries
+        )
+
+    def test_comment_is_validated_before_insert(self) -> None:
+        post = Post.objects.create(content="commented", user=self.user1)
+        url = reverse("posts:post-comment", kwargs={"pk": post.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client1.post(url, {"commentary": "x" * 351})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._commentary_inserts(queries), 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client1.post(url, {"commentary": "fine"})
+        self.assertEqual(response.data["commentary"], "fine")
+        self.assertEqual(self._commentary_inserts(queries), 1)
+        self.assertFalse(
+            any(
+                query["sql"].startswith(
+                    f'UPDATE "{Commentary._meta.db_table}"'
+                )
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_comment_batch(self) -> None:
+        post = Post.objects.create(content="commented", user=self.user1)
+        url = reverse("posts:post-comment-batch", kwargs={"pk": post.id})
+        payload = {
+            "commentaries": [{"commentary": f"reply {i}"} for i in range(5)]
+        }
+
+        self.client1.get(detail_post_url(post.id))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client1.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(self._commentary_inserts(queries), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 5)
+        self.assertEqual(
+            self.client1.get(detail_post_url(post.id))["X-Cache"], "MISS"
+        )
+
+    def test_comment_batch_is_all_or_nothing(self) -> None:
+        post = Post.objects.create(content="commented", user=self.user1)
+        url = reverse("posts:post-comment-batch", kwargs={"pk": post.id})
+        payload = {
+            "commentaries": [{"commentary": "fine"}, {"commentary": ""}]
+        }
+
+        response = self.client1.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Commentary.objects.filter(post=post).exists())
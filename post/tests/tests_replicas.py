@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from post.models import Post
+from social_media_api.db_router import (
+    PIN_COOKIE,
+    ReplicaRouter,
+    is_pinned,
+)
+
+POSTS_URL = reverse("posts:post-list")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="replica@gmail.com",
+            nickname="replica",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        Post.objects.create(content="post", user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # the test database stands in for the replica
+        patcher = mock.patch(
+            "social_media_api.db_router._choose_replica",
+            return_value="default",
+        )
+        self.choose_replica = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_safe_requests_read_from_replica(self) -> None:
+        for url in (POSTS_URL, reverse("users:create")):
+            with self.subTest(url):
+                self.choose_replica.reset_mock()
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.choose_replica.assert_called()
+
+    def test_cached_retrieves_are_computed_on_primary(self) -> None:
+        post = Post.objects.get()
+        for url in (
+            reverse("posts:post-detail", args=[post.pk]),
+            reverse("users:retrieve", args=[self.user.pk]),
+        ):
+            with self.subTest(url):
+                response = self.client.get(url)
+                self.assertEqual(response["X-Cache"], "MISS")
+                self.choose_replica.assert_not_called()
+
+    def test_writes_use_primary_and_pin_the_user(self) -> None:
+        response = self.client.post(POSTS_URL, {"content": "new"})
+
+        self.assertEqual(response.status_code, 201)
+        self.choose_replica.assert_not_called()
+        self.assertTrue(is_pinned(self.user.pk))
+
+        self.client.get(POSTS_URL)
+        self.choose_replica.assert_not_called()
+
+    def test_pin_cookie_reaches_other_workers(self) -> None:
+        response = self.client.post(POSTS_URL, {"content": "new"})
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # another worker, whose cache has not seen the pin
+        cache.clear()
+        self.client.get(POSTS_URL)
+        self.choose_replica.assert_not_called()
+
+        self.client.cookies.clear()
+        self.client.get(POSTS_URL)
+        self.choose_replica.assert_called()
+
+    def test_failed_writes_do_not_pin(self) -> None:
+        self.client.post(POSTS_URL, {"content": ""})
+
+        self.assertFalse(is_pinned(self.user.pk))
+
+    def test_views_without_opt_in_use_primary(self) -> None:
+        self.client.get(reverse("users:followers", args=[self.user.pk]))
+
+        self.choose_replica.assert_not_called()
+
+    def test_replicas_are_not_migrated(self) -> None:
+        router = ReplicaRouter()
+
+        self.assertIs(router.allow_migrate("replica", "post"), False)
+        self.assertIsNone(router.allow_migrate("default", "post"))
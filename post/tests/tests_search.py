@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from post.models import Post
+from user.models import UserFollowing
+
+SEARCH_URL = reverse("posts:post-search")
+
+
+class PostSearchTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="searcher@gmail.com",
+            nickname="searcher",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, query: str) -> list[int]:
+        response = self.client.get(SEARCH_URL, {"q": query})
+        return [post["id"] for post in response.data["results"]]
+
+    def test_search_ranks_matches(self) -> None:
+        weak = Post.objects.create(
+            content="holiday plans and a long list of other things to do",
+            user=self.user,
+        )
+        strong = Post.objects.create(content="holiday holiday", user=self.user)
+        Post.objects.create(content="nothing related", user=self.user)
+
+        self.assertEqual(self.search("holiday"), [strong.id, weak.id])
+
+    def test_search_follows_edits_and_deletes(self) -> None:
+        post = Post.objects.create(content="first draft", user=self.user)
+        post.content = "final version"
+        post.save()
+
+        self.assertEqual(self.search("draft"), [])
+        self.assertEqual(self.search("final"), [post.id])
+
+        post.delete()
+        self.assertEqual(self.search("final"), [])
+
+    def test_search_ignores_query_syntax(self) -> None:
+        Post.objects.create(content="quoted content", user=self.user)
+
+        self.assertEqual(self.search('"quoted AND ( *'), [])
+        self.assertEqual(self.search(""), [])
+
+    def test_search_is_limited_to_visible_posts(self) -> None:
+        author = get_user_model().objects.create_user(
+            email="author@gmail.com",
+            nickname="author",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        post = Post.objects.create(content="hidden holiday", user=author)
+        self.assertEqual(self.search("holiday"), [])
+
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=author
+        )
+        self.assertEqual(self.search("holiday"), [post.id])
@@ -0,0 +1,171 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from post.models import Post, TimelineEntry
+from user import graph
+from user.models import UserFollowing
+
+POSTS_URL = reverse("posts:post-list")
+
+
+class TimelineTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.reader = get_user_model().objects.create_user(
+            email="reader@gmail.com",
+            nickname="reader",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.author = get_user_model().objects.create_user(
+            email="author@gmail.com",
+            nickname="author",
+            date_of_birth="2012-01-01",
+            password="test2",
+        )
+        self.client.force_authenticate(self.reader)
+
+    def feed_ids(self) -> list[int]:
+        return [
+            post["id"] for post in self.client.get(POSTS_URL).data["results"]
+        ]
+
+    def test_post_is_fanned_out_to_followers(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        post = Post.objects.create(content="fresh post", user=self.author)
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(owner=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed_ids(), [post.id])
+
+    def test_follow_backfills_and_unfollow_trims(self) -> None:
+        old_post = Post.objects.create(content="old post", user=self.author)
+        self.assertEqual(self.feed_ids(), [])
+
+        following = UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        self.assertEqual(self.feed_ids(), [old_post.id])
+
+        following.delete()
+        self.assertEqual(self.feed_ids(), [])
+
+    def test_followers_count(self) -> None:
+        following = UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+
+        following.delete()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0)
+    def test_large_accounts_are_merged_on_read(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        own_post = Post.objects.create(content="own post", user=self.reader)
+        post = Post.objects.create(content="popular post", user=self.author)
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(owner=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed_ids(), [post.id, own_post.id])
+
+    def test_posts_of_formerly_large_accounts_stay_merged(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        with override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0):
+            graph.invalidate_popular()
+            popular_post = Post.objects.create(
+                content="popular post", user=self.author
+            )
+        graph.invalidate_popular()
+        post = Post.objects.create(content="fanned out", user=self.author)
+
+        self.assertFalse(Post.objects.get(pk=popular_post.pk).fanned_out)
+        self.assertTrue(
+            TimelineEntry.objects.filter(owner=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed_ids(), [post.id, popular_post.id])
+
+    def test_rebuild_timelines_command(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        post = Post.objects.create(content="lost post", user=self.author)
+        TimelineEntry.objects.all().delete()
+
+        call_command("rebuild_timelines", self.reader.email, stdout=StringIO())
+
+        self.assertEqual(self.feed_ids(), [post.id])
+
+    @override_settings(TIMELINE_BACKFILL_SIZE=1)
+    def test_posts_beyond_the_timeline_stay_reachable(self) -> None:
+        old_post = Post.objects.create(content="old post", user=self.author)
+        Post.objects.create(content="new post", user=self.author)
+        own_post = Post.objects.create(
+            content="own old post", user=self.reader
+        )
+        Post.objects.create(content="own new post", user=self.reader)
+        UserFollowing.objects.create(
+            user_id=self.reader, following_user_id=self.author
+        )
+        call_command("rebuild_timelines", self.reader.email, stdout=StringIO())
+        self.assertNotIn(old_post.id, self.feed_ids())
+
+        token = AccessToken.for_user(self.reader)
+        own_url = reverse("posts:post-detail", args=[own_post.id])
+        self.assertEqual(self.client.get(own_url).status_code, 200)
+        comments_url = reverse("posts:post-comments", args=[old_post.id])
+        self.assertEqual(self.client.get(comments_url).status_code, 200)
+        for post in (old_post, own_post):
+            response = APIClient().get(
+                reverse("posts:async-post-detail", kwargs={"pk": post.id}),
+                HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.delete(own_url).status_code, 204)
+
+    def test_feed_query_count_does_not_depend_on_followings(self) -> None:
+        def follow_authors(count: int) -> None:
+            for index in range(count):
+                author = get_user_model().objects.create_user(
+                    email=f"author{count}-{index}@gmail.com",
+                    nickname=f"a{count}-{index}",
+                    date_of_birth="2012-01-01",
+                    password="test",
+                )
+                UserFollowing.objects.create(
+                    user_id=self.reader, following_user_id=author
+                )
+                Post.objects.create(content="post", user=author)
+
+        follow_authors(1)
+        self.client.get(POSTS_URL)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(POSTS_URL)
+
+        follow_authors(10)
+        self.client.get(POSTS_URL)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(POSTS_URL)
+
+        self.assertEqual(len(few), len(many))
+        self.assertLessEqual(len(many), 2)
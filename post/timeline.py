@@ -0,0 +1,140 @@
+"""Fan-out-on-write home timelines.
+
+Every post is copied into the timeline of its author and of each follower
+when it is created, so reading the feed is a range scan over the timeline
+of a single owner. Authors with more than
+`settings.TIMELINE_FANOUT_MAX_FOLLOWERS` followers are not fanned out:
+their posts are marked `fanned_out=False` and merged into the feed at
+read time instead, also once the author drops below the limit again.
+"""
+
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+from post.models import Post, TimelineEntry
+from user import graph
+from user.models import User, UserFollowing
+
+
+def _is_fanout_exempt(author_id: int) -> bool:
+    return graph.is_popular(author_id)
+
+
+def _deliver(entries: Iterable[TimelineEntry]) -> None:
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_post(post: Post) -> None:
+    """Delivers `post` to the timelines of its author and followers."""
+
+    owner_ids = [post.user_id]
+    if _is_fanout_exempt(post.user_id):
+        post.fanned_out = False
+        Post.all_objects.filter(pk=post.pk).update(fanned_out=False)
+        if not graph.has_unfanned_posts(post.user_id):
+            graph.invalidate_unfanned()
+    else:
+        owner_ids.extend(
+            UserFollowing.objects.filter(following_user_id=post.user_id)
+            .values_list("user_id", flat=True)
+            .iterator(chunk_size=settings.TIMELINE_BATCH_SIZE)
+        )
+    _deliver(
+        TimelineEntry(owner_id=owner_id, post=post, created=post.created_at)
+        for owner_id in owner_ids
+    )
+
+
+def backfill_followings(follower_id: int, author_ids: list[int]) -> None:
+    """Copies the latest posts of newly followed authors into a timeline.
+
+    At most `TIMELINE_BACKFILL_SIZE` posts are copied per batch of
+    authors, the newest of all of them.
+    """
+
+    author_ids = [
+        author_id
+        for author_id in author_ids
+        if not _is_fanout_exempt(author_id)
+    ]
+    if not author_ids:
+        return
+
+    posts = Post.objects.filter(user_id__in=author_ids).order_by("-created_at")
+    _deliver(
+        TimelineEntry(owner_id=follower_id, post_id=pk, created=created_at)
+        for pk, created_at in posts.values_list("pk", "created_at")[
+            : settings.TIMELINE_BACKFILL_SIZE
+        ]
+    )
+
+
+def backfill_following(follower_id: int, author_id: int) -> None:
+    """Copies the latest posts of `author_id` into the follower timeline."""
+
+    backfill_followings(follower_id, [author_id])
+
+
+def trim_followings(follower_id: int, author_ids: list[int]) -> None:
+    """Removes posts of unfollowed authors from the follower timeline."""
+
+    TimelineEntry.objects.filter(
+        owner_id=follower_id, post__user_id__in=author_ids
+    ).delete()
+
+
+def rebuild_timeline(user: User) -> None:
+    """Recreates the timeline of `user` from own and followed posts."""
+
+    TimelineEntry.objects.filter(owner=user).delete()
+    posts = Post.objects.filter(user=user).order_by("-created_at")
+    _deliver(
+        TimelineEntry(owner=user, post_id=pk, created=created_at)
+        for pk, created_at in posts.values_list("pk", "created_at")[
+            : settings.TIMELINE_BACKFILL_SIZE
+        ]
+    )
+    for author_id in graph.following_ids(user.pk):
+        backfill_following(user.pk, author_id)
+
+
+def visible_to(user: User) -> QuerySet[Post]:
+    """Own posts of `user` and all posts of the users they follow.
+
+    Unlike `feed_for`, not limited to what the timeline holds, so posts
+    older than the backfill stay reachable by ID.
+    """
+
+    return Post.objects.filter(
+        Q(user=user)
+        | Q(
+            user_id__in=UserFollowing.objects.filter(user_id=user).values(
+                "following_user_id"
+            )
+        )
+    )
+
+
+def feed_for(user: User) -> QuerySet[Post]:
+    """Posts of the home timeline of `user`, the newest first."""
+
+    exempt_ids = graph.followed_popular_ids(user.pk)
+    if exempt_ids:
+        queryset = Post.objects.filter(
+            Q(
+                pk__in=TimelineEntry.objects.filter(owner=user).values(
+                    "post_id"
+                )
+            )
+            | Q(user_id__in=exempt_ids)
+        )
+    else:
+        queryset = Post.objects.filter(timeline_entries__owner=user)
+
+    return queryset.order_by("-created_at", "-id")
@@ -1,14 +1,22 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from post.views import PostViewSet, CommentaryViewSet
+from post.async_views import AsyncPostDetailView, AsyncPostFeedView
+from post.views import PostViewSet, CommentaryViewSet, HashtagViewSet
 
 router = routers.DefaultRouter()
 router.register("posts", PostViewSet, basename="post")
+router.register("hashtags", HashtagViewSet, basename="hashtag")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("commentaries/", CommentaryViewSet.as_view(), name="commentaries"),
+    path("async/posts/", AsyncPostFeedView.as_view(), name="async-post-list"),
+    path(
+        "async/posts/<int:pk>/",
+        AsyncPostDetailView.as_view(),
+        name="async-post-detail",
+    ),
 ]
 
 app_name = "posts"
@@ -1,6 +1,9 @@
+from types import ModuleType
 from typing import Type, Optional
 
-from django.db.models import QuerySet, Q
+from django.conf import settings
+from django.db.models import F, Prefetch, QuerySet
+from django.http import Http404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import status, generics
@@ -8,19 +11,39 @@ from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from post import services
-from post.models import Post, Commentary
+from post import deletion, hashtags, like_buffer, services, timeline
+from post.models import Post, Commentary, Hashtag
 from post.permissions import IsAuthenticatedOrAnonymous
+from post.search import search_posts
 from post.serializers import (
     PostSerializer,
     CommentarySerializer,
     PostListSerializer,
     LikePostSerializer,
     CommentaryRemoveSerializer,
+    CommentaryBatchSerializer,
+    HashtagSerializer,
 )
-from user.models import UserFollowing
+from social_media_api.cache import CachedRetrieveMixin
+from social_media_api.db_router import ReplicaReadMixin
+from social_media_api.pagination import RankedPagination
+
+
+def with_latest_commentaries(queryset: QuerySet[Post]) -> QuerySet[Post]:
+    """Prefetches the commentaries embedded by PostListSerializer."""
+
+    # a sliced Prefetch is limited per post with a ROW_NUMBER() window
+    return queryset.prefetch_related(
+        Prefetch(
+            "commentaries",
+            queryset=Commentary.objects.select_related("user")[
+                : settings.POST_EMBEDDED_COMMENTARIES
+            ],
+            to_attr="latest_commentaries",
+        )
+    )
 
 
 @extend_schema(
@@ -28,31 +51,28 @@ from user.models import UserFollowing
         OpenApiParameter("pk", OpenApiTypes.STR, OpenApiParameter.PATH)
     ]
 )
-class PostViewSet(ModelViewSet):
+class PostViewSet(ReplicaReadMixin, CachedRetrieveMixin, ModelViewSet):
     """Post CRUD endpoints"""
 
+    cache_kind = "post"
     lookup_field = "pk"
     serializer_class = PostSerializer
     permission_classes = (IsAuthenticatedOrAnonymous,)
 
     def get_queryset(self) -> QuerySet[Post]:
-        following_queryset = UserFollowing.objects.filter(
-            user_id=self.request.user
-        )
-        following_users_ids = [
-            user.following_user_id.id for user in following_queryset
-        ]
-        queryset = (
-            Post.objects.filter(
-                Q(user_id__in=following_users_ids) | Q(user=self.request.user)
-            )
-            .prefetch_related("commentaries__user")
-            .select_related("user")
-        )
+        if self.action == "list":
+            queryset = timeline.feed_for(self.request.user)
+        else:
+            queryset = timeline.visible_to(self.request.user)
+        queryset = queryset.select_related("user")
+        if self.action in ("list", "retrieve"):
+            queryset = with_latest_commentaries(queryset)
         hashtag = self.request.query_params.get("hashtag")
 
         if hashtag:
-            queryset = queryset.filter(content__icontains=hashtag)
+            queryset = queryset.filter(
+                hashtags__name=hashtags.normalize_hashtag(hashtag)
+            )
 
         return queryset
 
@@ -68,6 +88,9 @@ class PostViewSet(ModelViewSet):
     ) -> None:
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance: Post) -> None:
+        deletion.delete_post(instance)
+
     @action(
         methods=["POST"],
         detail=True,
@@ -77,9 +100,8 @@ class PostViewSet(ModelViewSet):
     def like(self, request: Request, pk: Optional[int] = None) -> Response:
         """Likes `obj`."""
 
-        obj = self.get_object()
-        services.add_like(obj, request.user)
-        return Response("You liked this post", status=status.HTTP_200_OK)
+        state = self._likes().add_like(self._get_post_id(), request.user)
+        return self._like_response(state)
 
     @action(
         methods=["POST"],
@@ -90,9 +112,27 @@ class PostViewSet(ModelViewSet):
     def unlike(self, request: Request, pk: Optional[int] = None) -> Response:
         """Dislikes `obj`."""
 
-        obj = self.get_object()
-        services.remove_like(obj, request.user)
-        return Response("You don't like this post", status=status.HTTP_200_OK)
+        state = self._likes().remove_like(self._get_post_id(), request.user)
+        return self._like_response(state)
+
+    @staticmethod
+    def _likes() -> ModuleType:
+        if settings.LIKE_WRITE_BEHIND:
+            return like_buffer
+        return services
+
+    def _get_post_id(self) -> int:
+        try:
+            return int(self.kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404
+
+    @staticmethod
+    def _like_response(state: Optional[services.LikeState]) -> Response:
+        if state is None:
+            raise Http404
+
+        return Response(state._asdict(), status=status.HTTP_200_OK)
 
     @action(
         methods=["POST"],
@@ -104,15 +144,62 @@ class PostViewSet(ModelViewSet):
         """Creates comment"""
 
         post = self.get_object()
-        commentary = request.data.get("commentary")
-        comm = Commentary.objects.create(
-            commentary=commentary, post=post, user=self.request.user
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comm = services.add_commentary(
+            post, request.user, serializer.validated_data["commentary"]
+        )
+
+        return Response(
+            self.get_serializer(comm).data, status=status.HTTP_200_OK
         )
-        serializer = self.get_serializer(comm, data=request.data)
+
+    @extend_schema(responses=CommentarySerializer(many=True))
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="comment-batch",
+        serializer_class=CommentaryBatchSerializer,
+    )
+    def comment_batch(
+        self, request: Request, pk: Optional[int] = None
+    ) -> Response:
+        """Creates many comments at once, all or none of them"""
+
+        post = self.get_object()
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        commentaries = services.add_commentaries(
+            post,
+            request.user,
+            [
+                item["commentary"]
+                for item in serializer.validated_data["commentaries"]
+            ],
+        )
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(
+            CommentarySerializer(commentaries, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="comments",
+        serializer_class=CommentarySerializer,
+    )
+    def comments(self, request: Request, pk: Optional[int] = None) -> Response:
+        """Commentaries of the post, the newest first"""
+
+        queryset = (
+            self.get_object()
+            .commentaries.select_related("user")
+            .order_by("-id")
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(
         methods=["POST"],
@@ -123,11 +210,10 @@ class PostViewSet(ModelViewSet):
     def remove(self, request: Request, pk: Optional[int] = None) -> Response:
         """Deletes all own commentaries"""
 
-        commentaries = self.get_object().commentaries.filter(
-            user_id=self.request.user.id
+        deleted = services.remove_commentaries(
+            self.get_object(), self.request.user
         )
-        if len(commentaries) > 0:
-            commentaries.delete()
+        if deleted:
             return Response(
                 "All my commentaries deleted", status=status.HTTP_200_OK
             )
@@ -140,29 +226,50 @@ class PostViewSet(ModelViewSet):
         url_path="liked",
     )
     def liked(self, request: Request, pk: Optional[int] = None) -> Response:
-        """Liked posts"""
-
-        queryset = self.filter_queryset(self.get_queryset()).filter()
-        like_qs = [
-            _
-            for _ in queryset
-            if list(_.likes.values("user_id")) != []
-            if self.request.user.id
-            in sum(list(_.likes.values_list("user_id")), ())
+        """Liked posts, the most recently liked first"""
+
+        queryset = (
+            Post.objects.filter(likes__user=request.user)
+            .annotate(liked_at=F("likes__created"))
+            .select_related("user")
+            .order_by("-liked_at", "-id")
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="Full-text query (ex. ?q=summer holidays)",
+                type=OpenApiTypes.STR,
+            ),
         ]
-        page = self.paginate_queryset(like_qs)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="search",
+        pagination_class=RankedPagination,
+    )
+    def search(self, request: Request, pk: Optional[int] = None) -> Response:
+        """Posts visible to the user matching the query, the most relevant
+        first"""
 
-        serializer = self.get_serializer(like_qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        query = request.query_params.get("q", "")
+        queryset = search_posts(
+            query, timeline.visible_to(request.user)
+        ).select_related("user")
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @extend_schema(
         parameters=[
             OpenApiParameter(
                 name="hashtag",
-                description="Filter by hashtag insensitive contains (ex. ?hashtag=post)",
+                description="Filter by hashtag (ex. ?hashtag=post)",
                 type=OpenApiTypes.STR,
             ),
         ]
@@ -181,3 +288,39 @@ class CommentaryViewSet(generics.ListAPIView):
         return Commentary.objects.filter(
             user_id=self.request.user.id
         ).select_related("post", "user")
+
+
+class HashtagViewSet(ReadOnlyModelViewSet):
+    """Hashtags with their post counts"""
+
+    queryset = Hashtag.objects.all()
+    serializer_class = HashtagSerializer
+    lookup_field = "name"
+    lookup_value_regex = "[^/]+"
+
+    def get_object(self) -> Hashtag:
+        self.kwargs[self.lookup_field] = hashtags.normalize_hashtag(
+            self.kwargs[self.lookup_field]
+        )
+        return super().get_object()
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="posts",
+        serializer_class=PostSerializer,
+    )
+    def posts(self, request: Request, name: Optional[str] = None) -> Response:
+        """Posts visible to the user tagged with the hashtag, the newest
+        first"""
+
+        queryset = (
+            timeline.visible_to(request.user)
+            .filter(post_hashtags__hashtag=self.get_object())
+            .annotate(tagged_at=F("post_hashtags__post_created_at"))
+            .select_related("user")
+            .order_by("-tagged_at", "-id")
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,100 @@
+"""Async counterpart of DRF's APIView for read-heavy endpoints.
+
+DRF views are synchronous, so under ASGI each of them holds a worker
+thread for the whole request, including every database round trip.
+Views built on `AsyncAPIView` await the async ORM instead and only fall
+back to a thread for the parts that have no async API.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class AsyncAPIView(View):
+    """Authenticated, JSON-rendering base of async read-only views"""
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    renderer = JSONRenderer()
+
+    async def authenticate(self, request: HttpRequest) -> Optional[Any]:
+        for authentication_class in self.authentication_classes:
+            authenticator = authentication_class()
+            if hasattr(authenticator, "aauthenticate"):
+                result = await authenticator.aauthenticate(request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(
+                    request
+                )
+            if result is not None:
+                return result[0]
+        return None
+
+    async def dispatch(
+        self, request: HttpRequest, *args: tuple, **kwargs: dict
+    ) -> HttpResponse:
+        try:
+            user = await self.authenticate(request)
+        except exceptions.APIException as exc:
+            return self.render({"detail": exc.detail}, exc.status_code)
+        if user is None or not user.is_authenticated:
+            return self.render(
+                {"detail": exceptions.NotAuthenticated.default_detail},
+                status.HTTP_401_UNAUTHORIZED,
+            )
+
+        request.user = user
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.render({"detail": exc.detail}, exc.status_code)
+
+    def render(self, data: Any, status_code: int = 200) -> HttpResponse:
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type="application/json",
+            status=status_code,
+        )
+
+
+def page_size(request: HttpRequest) -> int:
+    """`?page_size=`, bounded like the sync KeysetPagination."""
+
+    try:
+        size = int(request.GET["page_size"])
+    except (KeyError, ValueError):
+        return api_settings.PAGE_SIZE
+    return min(max(size, 1), settings.PAGINATION_MAX_PAGE_SIZE)
+
+
+def encode_cursor(created: datetime, pk: int) -> str:
+    position = f"{created.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created, pk = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise exceptions.NotFound("Invalid cursor")
+
+
+def next_page_url(request: HttpRequest, created: datetime, pk: int) -> str:
+    return replace_query_param(
+        request.build_absolute_uri(),
+        "cursor",
+        encode_cursor(created, pk),
+    )
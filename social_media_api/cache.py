@@ -0,0 +1,148 @@
+"""Versioned response cache for read endpoints.
+
+Cached payloads are keyed by the object, the requesting user and the
+current version counters of both. Writes never delete cached payloads,
+they bump the version counters instead (see the signal receivers in
+`post.signals` and `user.signals`), so stale entries simply stop being
+addressed and expire on their own.
+
+Bumps reach other workers only through a cache they share (see
+`CACHE_URL` in the settings); with the per-process LocMem fallback other
+workers serve their cached payloads until `RESPONSE_CACHE_TTL` passes.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from social_media_api.db_router import primary_reads
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def is_shared(alias: str = "default") -> bool:
+    """Whether the cache is seen by all workers, not just this process."""
+
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def _version_key(kind: str, pk: int) -> str:
+    return f"version:{kind}:{pk}"
+
+
+def _fresh_version() -> int:
+    # A lost counter must not restart from a value that was already used.
+    return time.time_ns()
+
+
+def bump_version(kind: str, pk: int) -> None:
+    """Invalidates every cached response that depends on the object."""
+
+    key = _version_key(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+def get_versions(*objects: tuple[str, int]) -> list[int]:
+    keys = [_version_key(kind, pk) for kind, pk in objects]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _fresh_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _record(kind: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[(kind, outcome)] += 1
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Hit/miss counters of this process, per kind of cached object."""
+
+    with _stats_lock:
+        result = {}
+        for (kind, outcome), count in _stats.items():
+            result.setdefault(kind, {})[outcome] = count
+        return result
+
+
+def cached_response(
+    kind: str, pk: int, user_id: int, compute: Callable[[], Any]
+) -> tuple[Any, bool]:
+    """Returns `(payload, hit)` for the object as seen by `user_id`.
+
+    Only one caller recomputes a missing payload (single flight): the
+    others wait for it up to `RESPONSE_CACHE_WAIT` seconds before giving
+    up and computing it themselves.
+    """
+
+    object_version, user_version = get_versions((kind, pk), ("user", user_id))
+    key = f"response:{kind}:{pk}:{object_version}:{user_id}:{user_version}"
+
+    payload = cache.get(key)
+    if payload is not None:
+        _record(kind, "hit")
+        return payload, True
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT):
+        try:
+            payload = compute()
+            cache.set(key, payload, timeout=settings.RESPONSE_CACHE_TTL)
+        finally:
+            cache.delete(lock_key)
+        _record(kind, "miss")
+        return payload, False
+
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.01)
+        payload = cache.get(key)
+        if payload is not None:
+            _record(kind, "hit")
+            return payload, True
+
+    _record(kind, "miss")
+    return compute(), False
+
+
+class CachedRetrieveMixin:
+    """Serves `retrieve` of a DRF view from the versioned response cache"""
+
+    cache_kind: str
+
+    def retrieve(
+        self, request: Request, *args: tuple, **kwargs: dict
+    ) -> Response:
+        retrieve = super().retrieve
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            pk = int(self.kwargs[lookup])
+        except ValueError:
+            return retrieve(request, *args, **kwargs)
+
+        def compute() -> Any:
+            # a payload read from a lagging replica would be cached under
+            # the new version and outlive the replica lag
+            with primary_reads():
+                return retrieve(request, *args, **kwargs).data
+
+        payload, hit = cached_response(
+            self.cache_kind, pk, request.user.pk, compute
+        )
+        response = Response(payload)
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        return response
@@ -0,0 +1,131 @@
+"""Read replica routing with read-your-writes stickiness.
+
+Views opt in with `ReplicaReadMixin`: queries of their safe-method
+requests go to a random alias of `settings.DATABASE_REPLICAS`, everything
+else uses `default`. After a successful write request the user is pinned
+to the primary for `settings.REPLICA_PIN_SECONDS` (see
+`ReplicaPinMiddleware`), so their next reads include their own post,
+like or follow even when the replicas lag behind. The pin is kept in the
+cache, which reaches every worker when it is shared (`CACHE_URL`), and
+in a signed cookie for clients that send cookies back.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core import signing
+from django.db import models
+from django.http import HttpRequest, HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+
+_reads_from_replica: ContextVar[bool] = ContextVar(
+    "reads_from_replica", default=False
+)
+
+PIN_COOKIE = "primary_pin"
+
+
+def _pin_key(user_id: int) -> str:
+    return f"replica:pin:{user_id}"
+
+
+def pin_to_primary(user_id: int, response: HttpResponse) -> None:
+    """Sends reads of `user_id` to the primary for a short while."""
+
+    cache.set(_pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+    response.set_signed_cookie(
+        PIN_COOKIE,
+        user_id,
+        salt=PIN_COOKIE,
+        max_age=settings.REPLICA_PIN_SECONDS,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def is_pinned(user_id: int, request: Optional[HttpRequest] = None) -> bool:
+    if request is not None:
+        try:
+            pinned_id = request.get_signed_cookie(
+                PIN_COOKIE,
+                salt=PIN_COOKIE,
+                max_age=settings.REPLICA_PIN_SECONDS,
+            )
+        except (KeyError, signing.BadSignature):
+            pass
+        else:
+            if pinned_id == str(user_id):
+                return True
+    return cache.get(_pin_key(user_id), False)
+
+
+def reads_from_replica() -> bool:
+    """Whether queries of the current request go to a replica."""
+
+    return bool(settings.DATABASE_REPLICAS) and _reads_from_replica.get()
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Reads from the primary within the block, even in opted-in views."""
+
+    token = _reads_from_replica.set(False)
+    try:
+        yield
+    finally:
+        _reads_from_replica.reset(token)
+
+
+def _choose_replica() -> str:
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    """Routes reads of opted-in requests to the replicas"""
+
+    def db_for_read(self, model: type[models.Model], **hints: dict) -> Any:
+        if reads_from_replica():
+            return _choose_replica()
+        return None
+
+    def db_for_write(self, model: type[models.Model], **hints: dict) -> str:
+        return "default"
+
+    def allow_relation(
+        self, obj1: models.Model, obj2: models.Model, **hints: dict
+    ) -> bool:
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(
+        self, db: str, app_label: str, **hints: dict
+    ) -> Optional[bool]:
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Serves safe-method requests from the replicas unless the user is
+    pinned to the primary"""
+
+    def dispatch(self, request: Request, *args: tuple, **kwargs: dict) -> Any:
+        token = _reads_from_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _reads_from_replica.reset(token)
+
+    def initial(self, request: Request, *args: tuple, **kwargs: dict) -> None:
+        # authenticates, so the pin can be looked up afterwards
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not (
+            request.user.is_authenticated
+            and is_pinned(request.user.pk, request)
+        ):
+            _reads_from_replica.set(True)
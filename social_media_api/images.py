@@ -0,0 +1,174 @@
+"""Resized image variants for uploaded post and profile images.
+
+After an image is saved, its model instance gets `<field>_width`,
+`<field>_height` and `<field>_variants` filled in by a worker process:
+the original is re-encoded without EXIF metadata and every size of
+`settings.IMAGE_VARIANTS` is rendered in the original format and WebP.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, models, transaction
+from PIL import Image, ImageOps
+from rest_framework.request import Request
+
+from social_media_api.cache import bump_version
+
+logger = logging.getLogger(__name__)
+
+KEPT_METADATA = ("icc_profile", "transparency")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PIPELINE_WORKERS
+            )
+        return _executor
+
+
+def _webp_ready(image: Image.Image) -> Image.Image:
+    """`image` in a mode WebP can encode, keeping its transparency."""
+
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    if "A" in image.getbands() or "transparency" in image.info:
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
+
+def render_variants(path: str, sizes: dict[str, int], quality: int) -> dict:
+    """Strips EXIF from the image at `path` and renders its variants.
+
+    Runs in a worker process, so it only deals with plain file paths.
+    """
+
+    stem, extension = os.path.splitext(path)
+    with Image.open(path) as source:
+        image_format = source.format
+        image = ImageOps.exif_transpose(source)
+    # drop EXIF and the rest of the metadata, except what affects rendering
+    image.info = {
+        key: value for key, value in image.info.items() if key in KEPT_METADATA
+    }
+
+    image.save(path, format=image_format, quality=quality)
+    variants = {}
+    for name, size in sizes.items():
+        variant = image.copy()
+        variant.thumbnail((size, size))
+        original_path = f"{stem}_{name}{extension}"
+        webp_path = f"{stem}_{name}.webp"
+        variant.save(original_path, format=image_format, quality=quality)
+        _webp_ready(variant).save(webp_path, format="WEBP", quality=quality)
+        variants[name] = {
+            "original": os.path.basename(original_path),
+            "webp": os.path.basename(webp_path),
+        }
+
+    return {"width": image.width, "height": image.height, "variants": variants}
+
+
+def _store(
+    model: type, pk: int, field_name: str, name: str, result: dict
+) -> None:
+    directory = os.path.dirname(name)
+    variants = {
+        variant: {
+            image_format: os.path.join(directory, file_name)
+            for image_format, file_name in formats.items()
+        }
+        for variant, formats in result["variants"].items()
+    }
+    variants["source"] = name
+
+    queryset = model.objects.filter(pk=pk, **{field_name: name})
+    previous = queryset.values_list(f"{field_name}_variants", flat=True)
+    stale = [
+        file_name
+        for previous_variants in previous
+        for variant, formats in previous_variants.items()
+        if variant != "source"
+        for file_name in formats.values()
+        if file_name not in variants.get(variant, {}).values()
+    ]
+    updated = queryset.update(
+        **{
+            f"{field_name}_width": result["width"],
+            f"{field_name}_height": result["height"],
+            f"{field_name}_variants": variants,
+        }
+    )
+    if updated:
+        bump_version(model._meta.model_name, pk)
+        for file_name in stale:
+            default_storage.delete(file_name)
+
+
+def _process(model: type, pk: int, field_name: str, name: str) -> None:
+    args = (
+        default_storage.path(name),
+        settings.IMAGE_VARIANTS,
+        settings.IMAGE_QUALITY,
+    )
+    if not settings.IMAGE_PIPELINE_WORKERS:
+        _store(model, pk, field_name, name, render_variants(*args))
+        return
+
+    def done(future: Future) -> None:
+        if future.exception() is not None:
+            logger.error(
+                "Rendering variants of %s failed",
+                name,
+                exc_info=future.exception(),
+            )
+            return
+        # runs in a helper thread of the pool with its own connection
+        close_old_connections()
+        _store(model, pk, field_name, name, future.result())
+
+    _get_executor().submit(render_variants, *args).add_done_callback(done)
+
+
+def schedule_variants(instance: models.Model, field_name: str) -> None:
+    """Renders variants of a newly uploaded image once it is committed."""
+
+    name = getattr(instance, field_name).name
+    variants = getattr(instance, f"{field_name}_variants")
+    if not name or variants.get("source") == name:
+        return
+
+    transaction.on_commit(
+        lambda: _process(type(instance), instance.pk, field_name, name)
+    )
+
+
+def variant_urls(
+    instance: models.Model, field_name: str, request: Optional[Request]
+) -> dict[str, dict[str, str]]:
+    """Absolute URLs of the rendered variants, keyed by size and format."""
+
+    variants = getattr(instance, f"{field_name}_variants") or {}
+    urls = {}
+    for variant, formats in variants.items():
+        if variant == "source":
+            continue
+        urls[variant] = {}
+        for image_format, name in formats.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[variant][image_format] = url
+    return urls
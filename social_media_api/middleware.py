@@ -0,0 +1,238 @@
+"""Per-request SQL and timing instrumentation.
+
+`QueryInstrumentationMiddleware` counts the queries of every request on
+all database connections, sums their time and remembers the slowest one.
+Staff users get the numbers in a `Server-Timing` header, requests over
+the `REQUEST_BUDGET_*` settings are logged. The middleware is switched
+on and off through the shared cache (`CACHE_URL`, see the
+`request_instrumentation` command), so running workers pick the change
+up without a restart.
+
+`ReplicaPinMiddleware` supports the read replica routing of
+`social_media_api.db_router`.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from contextlib import ExitStack
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from social_media_api.db_router import pin_to_primary
+
+logger = logging.getLogger(__name__)
+
+ENABLED_KEY = "instrumentation:enabled"
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_PLACEHOLDERS_RE = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_switch = {"enabled": None, "checked": 0.0}
+
+
+def fingerprint(sql: str) -> str:
+    """Shape of `sql` with literals and IN lists collapsed."""
+
+    sql = _LITERAL_RE.sub("?", sql)
+    sql = _PLACEHOLDERS_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def set_enabled(enabled: Optional[bool]) -> None:
+    """Turns instrumentation on or off, `None` restores the setting."""
+
+    if enabled is None:
+        cache.delete(ENABLED_KEY)
+    else:
+        cache.set(ENABLED_KEY, enabled, timeout=None)
+    _switch["checked"] = 0.0
+
+
+def is_enabled() -> bool:
+    """Whether requests are instrumented, re-read from the cache at most
+    every `REQUEST_INSTRUMENTATION_REFRESH` seconds."""
+
+    now = time.monotonic()
+    if now - _switch["checked"] >= settings.REQUEST_INSTRUMENTATION_REFRESH:
+        _switch["enabled"] = cache.get(
+            ENABLED_KEY, settings.REQUEST_INSTRUMENTATION
+        )
+        _switch["checked"] = now
+    return _switch["enabled"]
+
+
+class QueryStats:
+    """Queries run while `record()` is active"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = ""
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            if duration > self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_sql = sql
+
+    def record(self) -> ExitStack:
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+    @property
+    def slowest_fingerprint(self) -> str:
+        if not self.slowest_sql:
+            return ""
+        return hashlib.sha1(
+            fingerprint(self.slowest_sql).encode()
+        ).hexdigest()[:12]
+
+
+class QueryInstrumentationMiddleware:
+    """Measures queries and time of each request, see the module docs"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(
+        self, request: HttpRequest
+    ) -> Union[HttpResponse, Awaitable[HttpResponse]]:
+        if self.is_async:
+            return self.__acall__(request)
+        if not is_enabled():
+            return self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        with stats.record():
+            response = self.get_response(request)
+        self.report(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not is_enabled():
+            return await self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        with stats.record():
+            response = await self.get_response(request)
+        self.report(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def report(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        stats: QueryStats,
+        duration: float,
+    ) -> None:
+        match = request.resolver_match
+        view_name = match.view_name if match else ""
+        db_ms = stats.duration * 1000
+        total_ms = duration * 1000
+
+        # DRF and AsyncAPIView put the token-authenticated user here
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            timings = [
+                f'db;dur={db_ms:.1f};desc="{stats.count} queries"',
+                f"total;dur={total_ms:.1f}",
+            ]
+            if stats.slowest_sql:
+                timings.append(
+                    f"slowest;dur={stats.slowest_duration * 1000:.1f};"
+                    f'desc="{stats.slowest_fingerprint}"'
+                )
+            if view_name:
+                timings.append(f'view;desc="{view_name}"')
+            response["Server-Timing"] = ", ".join(timings)
+
+        if (
+            stats.count > settings.REQUEST_BUDGET_QUERIES
+            or db_ms > settings.REQUEST_BUDGET_DB_MS
+            or total_ms > settings.REQUEST_BUDGET_MS
+        ):
+            logger.warning(
+                "%s %s (%s) over budget: %d queries, %.1f ms in DB, "
+                "%.1f ms total, slowest %.1f ms [%s] %s",
+                request.method,
+                request.path,
+                view_name,
+                stats.count,
+                db_ms,
+                total_ms,
+                stats.slowest_duration * 1000,
+                stats.slowest_fingerprint,
+                fingerprint(stats.slowest_sql),
+            )
+
+
+class ReplicaPinMiddleware:
+    """Pins users to the primary database after their write requests,
+    see `social_media_api.db_router`"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(
+        self, request: HttpRequest
+    ) -> Union[HttpResponse, Awaitable[HttpResponse]]:
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.pin(request, response)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        response = await self.get_response(request)
+        self.pin(request, response)
+        return response
+
+    def pin(self, request: HttpRequest, response: HttpResponse) -> None:
+        if (
+            request.method in SAFE_METHODS
+            or response.status_code >= 400
+            or not settings.DATABASE_REPLICAS
+        ):
+            return
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.pk, response)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db.models import QuerySet
+from django.views import View
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.request import Request
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination following the ordering of the paginated queryset
+
+    Querysets are expected to be ordered on an indexed timestamp with the
+    primary key as a tie breaker, e.g. ("-created_at", "-id").
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+
+    def get_ordering(
+        self, request: Request, queryset: QuerySet, view: View
+    ) -> tuple:
+        return tuple(queryset.query.order_by or queryset.model._meta.ordering)
+
+
+class RankedPagination(PageNumberPagination):
+    """Page numbers for results ordered by a computed relevance rank"""
+
+    page_size_query_param = "page_size"
+    max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
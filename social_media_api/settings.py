@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "debug_toolbar",
     "drf_spectacular",
@@ -52,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "social_media_api.middleware.QueryInstrumentationMiddleware",
+    "social_media_api.middleware.ReplicaPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -96,6 +99,88 @@ DATABASES = {
     }
 }
 
+# Read replicas, comma separated hosts sharing the credentials of
+# default, see social_media_api.db_router. Tests mirror them to default
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")), 1
+):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+# To try the routing locally, SQLITE_PRIMARY and SQLITE_REPLICA name two
+# SQLite files used instead of PostgreSQL; copy the migrated primary to
+# the replica, writes then only reach the primary
+if os.environ.get("SQLITE_PRIMARY"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ["SQLITE_PRIMARY"],
+            # file-backed, so that the concurrency tests can run
+            "TEST": {"NAME": f"{os.environ['SQLITE_PRIMARY']}.test"},
+        }
+    }
+    DATABASE_REPLICAS = []
+    if os.environ.get("SQLITE_REPLICA"):
+        DATABASES["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ["SQLITE_REPLICA"],
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append("replica")
+
+DATABASE_ROUTERS = ["social_media_api.db_router.ReplicaRouter"]
+
+# How long users read from the primary after they wrote something
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Invalidation (version bumps, dropped graph entries) only reaches other
+# workers through a shared cache: set CACHE_URL to a Redis server, e.g.
+# redis://localhost:6379/0, in production. Without it every process has
+# its own LocMem cache, which is only right for a single process.
+CACHE_URL = os.environ.get("CACHE_URL", "")
+
+if CACHE_URL:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_URL,
+    }
+else:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "social-media-api",
+    }
+
+CACHES = {
+    "default": DEFAULT_CACHE,
+    # users resolved from JWTs, see user.authentication
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "social-media-api-auth",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+if CACHE_URL:
+    # dropped entries must reach every worker as well
+    CACHES["auth"] = {**DEFAULT_CACHE, "KEY_PREFIX": "auth"}
+
+AUTH_USER_CACHE_TTL = 60
+
+# Versioned response cache of post and profile reads
+RESPONSE_CACHE_TTL = 300
+# How long a recompute may hold the single-flight lock
+RESPONSE_CACHE_LOCK_TIMEOUT = 10
+# How long concurrent readers wait for that recompute
+RESPONSE_CACHE_WAIT = 2
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -145,14 +230,19 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "social_media_api.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
 }
 
+# Upper bound for the ?page_size= query parameter of list endpoints
+PAGINATION_MAX_PAGE_SIZE = 100
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Social Media API",
     "DESCRIPTION": "Social media platform",
@@ -172,3 +262,70 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
 }
+
+# Home timelines are fanned out on write, except for authors with more
+# followers than this limit, whose posts are merged into the feed on read.
+TIMELINE_FANOUT_MAX_FOLLOWERS = 10_000
+
+# Lifetime of the cached follow graph (user.graph); follows drop the
+# entries at once where the cache is shared, elsewhere after this
+GRAPH_CACHE_TTL = 60
+
+# Rows fetched per query while streaming a data export
+EXPORT_CHUNK_SIZE = 2000
+
+# Users returned by /users/autocomplete/ and how long a prefix is cached
+USER_AUTOCOMPLETE_LIMIT = 10
+USER_AUTOCOMPLETE_CACHE_TTL = 30
+
+# "Who to follow" entries stored per user by compute_follow_suggestions
+FOLLOW_SUGGESTIONS_PER_USER = 20
+
+FOLLOW_SUGGESTIONS_BATCH_SIZE = 500
+
+# Upper bound of users followed or unfollowed by one bulk request
+FOLLOW_BULK_MAX_USERS = 500
+
+# Upper bound of commentaries created by one batch request
+COMMENT_BATCH_MAX_SIZE = 500
+
+# Number of latest posts copied into a timeline on follow/rebuild
+TIMELINE_BACKFILL_SIZE = 200
+
+TIMELINE_BATCH_SIZE = 1000
+
+# Latest commentaries embedded into each post of the feed, the rest is
+# paginated by /posts/<id>/comments/
+POST_EMBEDDED_COMMENTARIES = 3
+
+# Resized variants rendered for every uploaded image, by longest side
+IMAGE_VARIANTS = {"thumbnail": 150, "medium": 600, "large": 1200}
+
+IMAGE_QUALITY = 85
+
+# Worker processes rendering the variants; 0 renders them in-process
+# right after the upload is committed, which is what tests use
+IMAGE_PIPELINE_WORKERS = int(os.environ.get("IMAGE_PIPELINE_WORKERS", 2))
+
+# Per-request query instrumentation, see social_media_api.middleware.
+# The `request_instrumentation` command overrides the default at runtime
+REQUEST_INSTRUMENTATION = True
+# How often workers re-read the runtime switch, in seconds
+REQUEST_INSTRUMENTATION_REFRESH = 10
+# Requests above any of these budgets are logged
+REQUEST_BUDGET_QUERIES = 30
+REQUEST_BUDGET_DB_MS = 200
+REQUEST_BUDGET_MS = 500
+
+# Rows deleted per transaction when purging deleted posts and accounts
+DELETION_CHUNK_SIZE = 1000
+# Threads purging them in each web process; 0 leaves the queue to the
+# drain_deletion_queue command
+DELETION_WORKER_THREADS = int(os.environ.get("DELETION_WORKER_THREADS", 1))
+
+# Buffers like/unlike toggles in each web process and writes them in
+# batches, see post.like_buffer
+LIKE_WRITE_BEHIND = os.environ.get("LIKE_WRITE_BEHIND") == "1"
+# Seconds between flushes of the buffer; 0 flushes only on exit
+LIKE_FLUSH_INTERVAL = float(os.environ.get("LIKE_FLUSH_INTERVAL", 1))
+LIKE_FLUSH_BATCH_SIZE = 1000
@@ -24,11 +24,14 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
+from social_media_api.views import CacheStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("__debug__/", include("debug_toolbar.urls")),
     path("api/media/", include("post.urls", namespace="posts")),
     path("api/users/", include("user.urls", namespace="users")),
+    path("api/cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/doc/swagger/",
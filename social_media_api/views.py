@@ -0,0 +1,17 @@
+import os
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from social_media_api import cache
+
+
+class CacheStatsView(APIView):
+    """Response cache hits and misses of the worker answering, by kind"""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request: Request) -> Response:
+        return Response({"pid": os.getpid(), "kinds": cache.stats()})
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest, HttpResponse
+from rest_framework import status
+
+from social_media_api.async_views import AsyncAPIView
+from user.serializers import UserSerializer
+
+
+class AsyncRetrieveUserView(AsyncAPIView):
+    """User profile, served without holding a worker thread"""
+
+    async def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        try:
+            user = await get_user_model().objects.aget(
+                pk=pk, deleted_at__isnull=True
+            )
+        except get_user_model().DoesNotExist:
+            return self.render(
+                {"detail": "Not found."}, status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = UserSerializer(user, context={"request": request})
+        return self.render(serializer.data)
@@ -0,0 +1,88 @@
+"""JWT authentication that does not load the user row on every request.
+
+The token signature and claims are still validated on every request,
+which needs no database access. The user it refers to is read from the
+"auth" cache for `settings.AUTH_USER_CACHE_TTL` seconds and dropped from
+it whenever the user is saved or deleted (see `user.signals`).
+
+With `CACHE_URL` set the "auth" cache is shared, so deactivation and
+password changes apply at once. The per-process LocMem fallback is only
+cleared in the worker that saved the user, other workers keep accepting
+the user for up to `AUTH_USER_CACHE_TTL` seconds.
+"""
+
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from user.models import User
+
+
+def _user_key(user_id: int) -> str:
+    return f"auth:user:{user_id}"
+
+
+def forget_user(user_id: int) -> None:
+    """Makes the next request of `user_id` load the user from the DB."""
+
+    caches["auth"].delete(_user_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication resolving users through the "auth" cache"""
+
+    def _user_id(self, validated_token: Token) -> Any:
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+
+    def _load_user(self, validated_token: Token) -> User:
+        # raises AuthenticationFailed for missing and inactive users
+        user = super().get_user(validated_token)
+        caches["auth"].set(
+            _user_key(user.pk), user, timeout=settings.AUTH_USER_CACHE_TTL
+        )
+        return user
+
+    def get_user(self, validated_token: Token) -> User:
+        user_id = self._user_id(validated_token)
+        user = caches["auth"].get(_user_key(user_id))
+        if user is None:
+            user = self._load_user(validated_token)
+        return user
+
+    async def aauthenticate(
+        self, request: HttpRequest
+    ) -> Optional[tuple[User, Token]]:
+        """`authenticate` for async views, the DB is only hit on a miss."""
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user_id = self._user_id(validated_token)
+        # the "auth" cache is Redis with CACHE_URL set, never block the
+        # event loop on it
+        user = await caches["auth"].aget(_user_key(user_id))
+        if user is None:
+            user = await sync_to_async(self._load_user)(validated_token)
+        return user, validated_token
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.CachedJWTAuthentication"
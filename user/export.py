@@ -0,0 +1,111 @@
+"""Streaming NDJSON export of everything a user has created.
+
+Every line is a JSON object with a `type` key. Records are read with
+`QuerySet.iterator()` in chunks of `settings.EXPORT_CHUNK_SIZE` rows and
+encoded one at a time, so memory use does not grow with the account.
+
+Django buffers a sync iterator completely before sending it under ASGI,
+so ASGI responses stream `async_chunks()` instead.
+"""
+
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet
+
+from post.models import Commentary, Like, Post
+from user.models import User, UserFollowing
+
+# zlib writes a gzip header and trailer with this window size
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _rows(record_type: str, queryset: QuerySet) -> Iterator[dict]:
+    for row in queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        yield {"type": record_type, **row}
+
+
+def export_records(user: User) -> Iterator[dict]:
+    """All records of `user`, one dict per record."""
+
+    yield {
+        "type": "user",
+        "id": user.pk,
+        "email": user.email,
+        "nickname": user.nickname,
+        "biography": user.biography,
+        "date_of_birth": user.date_of_birth,
+        "date_joined": user.date_joined,
+        "profile_image": user.profile_image.name,
+    }
+    yield from _rows(
+        "post",
+        Post.objects.filter(user=user)
+        .order_by("id")
+        .values("id", "created_at", "content", "image"),
+    )
+    yield from _rows(
+        "commentary",
+        Commentary.objects.filter(user=user)
+        .order_by("id")
+        .values("id", "post_id", "created_at", "commentary"),
+    )
+    yield from _rows(
+        "like",
+        Like.objects.filter(user=user)
+        .order_by("id")
+        .values("id", "object_id", "created")
+        .annotate(object_type=F("content_type__model")),
+    )
+    yield from _rows(
+        "following",
+        UserFollowing.objects.filter(user_id=user)
+        .order_by("id")
+        .values("id", "created")
+        .annotate(user=F("following_user_id__email")),
+    )
+    yield from _rows(
+        "follower",
+        UserFollowing.objects.filter(following_user_id=user)
+        .order_by("id")
+        .values("id", "created")
+        .annotate(user=F("user_id__email")),
+    )
+
+
+def ndjson_lines(user: User) -> Iterator[bytes]:
+    """The export of `user` as NDJSON, one encoded line at a time."""
+
+    for record in export_records(user):
+        yield json.dumps(record, cls=DjangoJSONEncoder).encode() + b"\n"
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresses a byte stream on the fly into gzip format."""
+
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def async_chunks(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Streams `chunks` to an ASGI server a chunk at a time.
+
+    Every chunk is read in the thread of the request, which owns the
+    database connection and its server-side cursors.
+    """
+
+    iterator = iter(chunks)
+    read = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await read(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
@@ -0,0 +1,133 @@
+"""Cached adjacency of the follow graph.
+
+Followed user IDs are cached per user as compact sorted int arrays, so
+follow-based filters cost a cache read instead of a query. The entries
+are dropped by the `UserFollowing` signal receivers in `user.signals`
+and expire after `settings.GRAPH_CACHE_TTL` seconds, which bounds how
+long workers without a shared cache keep a stale copy. The authors
+whose posts are merged into feeds on read (see `post.timeline`) are
+cached the same way.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from post.models import Post
+from user.models import User, UserFollowing
+
+POPULAR_KEY = "graph:popular"
+UNFANNED_KEY = "graph:unfanned"
+
+
+def _following_key(user_id: int) -> str:
+    return f"graph:following:{user_id}"
+
+
+def _pack(ids: Iterable[int]) -> bytes:
+    return array("q", sorted(ids)).tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    ids = array("q")
+    ids.frombytes(data)
+    return ids
+
+
+def _load_following(user_id: int) -> bytes:
+    data = _pack(
+        UserFollowing.objects.filter(user_id=user_id).values_list(
+            "following_user_id", flat=True
+        )
+    )
+    cache.set(_following_key(user_id), data, timeout=settings.GRAPH_CACHE_TTL)
+    return data
+
+
+def _load_popular() -> bytes:
+    data = _pack(
+        User.objects.filter(
+            followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+        ).values_list("pk", flat=True)
+    )
+    cache.set(POPULAR_KEY, data, timeout=settings.GRAPH_CACHE_TTL)
+    return data
+
+
+def _load_unfanned() -> bytes:
+    data = _pack(
+        Post.objects.filter(fanned_out=False)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    cache.set(UNFANNED_KEY, data, timeout=settings.GRAPH_CACHE_TTL)
+    return data
+
+
+def _contains(ids: array, user_id: int) -> bool:
+    index = bisect_left(ids, user_id)
+    return index < len(ids) and ids[index] == user_id
+
+
+def following_ids(user_id: int) -> array:
+    """Sorted IDs of the users followed by `user_id`."""
+
+    data = cache.get(_following_key(user_id))
+    if data is None:
+        data = _load_following(user_id)
+    return _unpack(data)
+
+
+def popular_ids() -> array:
+    """Sorted IDs of users too popular to be fanned out to timelines."""
+
+    data = cache.get(POPULAR_KEY)
+    if data is None:
+        data = _load_popular()
+    return _unpack(data)
+
+
+def is_popular(user_id: int) -> bool:
+    return _contains(popular_ids(), user_id)
+
+
+def has_unfanned_posts(user_id: int) -> bool:
+    """Whether posts of `user_id` were kept out of follower timelines."""
+
+    data = cache.get(UNFANNED_KEY)
+    if data is None:
+        data = _load_unfanned()
+    return _contains(_unpack(data), user_id)
+
+
+def followed_popular_ids(user_id: int) -> list[int]:
+    """Users followed by `user_id` whose posts are merged on read: the
+    popular ones and those with posts written while they were popular.
+    Read in one cache round trip."""
+
+    key = _following_key(user_id)
+    cached = cache.get_many([key, POPULAR_KEY, UNFANNED_KEY])
+    # an empty array packs to b"", so test for presence, not truthiness
+    following = cached[key] if key in cached else _load_following(user_id)
+    popular = cached[POPULAR_KEY] if POPULAR_KEY in cached else _load_popular()
+    unfanned = (
+        cached[UNFANNED_KEY] if UNFANNED_KEY in cached else _load_unfanned()
+    )
+    merged = set(_unpack(popular)).union(_unpack(unfanned))
+    return sorted(merged.intersection(_unpack(following)))
+
+
+def invalidate_following(user_id: int) -> None:
+    cache.delete(_following_key(user_id))
+
+
+def invalidate_popular() -> None:
+    cache.delete(POPULAR_KEY)
+
+
+def invalidate_unfanned() -> None:
+    cache.delete(UNFANNED_KEY)
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from user.models import SuggestionRun
+from user.suggestions import compute_suggestions, start_run
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes follow suggestions of users whose follow graph changed "
+        "since the previous run, resuming an interrupted run if any"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute suggestions of all users, dropping the "
+            "progress of an interrupted run",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.FOLLOW_SUGGESTIONS_BATCH_SIZE,
+            help="Number of users computed per statement",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        run = start_run(full=options["full"])
+        if run.processed:
+            self.stdout.write(
+                f"Resuming after user {run.last_user_id} "
+                f"({run.processed} user(s) done)"
+            )
+
+        def progress(run: SuggestionRun) -> None:
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{run.processed} user(s) done")
+
+        run = compute_suggestions(
+            run, batch_size=options["batch_size"], progress=progress
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Computed suggestions for {run.processed} user(s)"
+            )
+        )
@@ -0,0 +1,48 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from user import export
+
+
+class Command(BaseCommand):
+    help = "Streams all records of a user as NDJSON"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("email", help="Email of the user to export")
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write the export to (stdout by default)",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the export with gzip",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['email']} does not exist")
+
+        chunks = export.ndjson_lines(user)
+        if options["gzip"]:
+            chunks = export.gzip_chunks(chunks)
+
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options["output"], "wb") as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(f"Exported {user.email} to {options['output']}")
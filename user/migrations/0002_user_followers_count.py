@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_followers_count(apps, schema_editor):
+    User = apps.get_model("user", "User")
+    UserFollowing = apps.get_model("user", "UserFollowing")
+
+    followers = (
+        UserFollowing.objects.filter(following_user_id=OuterRef("pk"))
+        .order_by()
+        .values("following_user_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    User.objects.update(
+        followers_count=Coalesce(Subquery(followers), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_followers_count, migrations.RunPython.noop),
+    ]
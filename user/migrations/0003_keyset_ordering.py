@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0002_user_followers_count"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="userfollowing",
+            options={"ordering": ["-created", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["-date_joined", "-id"], name="user_date_joined_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:40
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    "CREATE INDEX user_nickname_trgm_idx "
+    "ON user_user USING gin (nickname gin_trgm_ops)",
+    "CREATE INDEX user_email_trgm_idx "
+    "ON user_user USING gin (email gin_trgm_ops)",
+]
+
+POSTGRESQL_BACKWARDS = [
+    "DROP INDEX IF EXISTS user_email_trgm_idx",
+    "DROP INDEX IF EXISTS user_nickname_trgm_idx",
+]
+
+# SQLite fallback, kept in sync from user.search
+SQLITE_FORWARDS = [
+    "CREATE VIRTUAL TABLE user_user_fts "
+    "USING fts5(nickname, email, tokenize='trigram')",
+    "INSERT INTO user_user_fts(rowid, nickname, email) "
+    "SELECT id, nickname, email FROM user_user",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TABLE IF EXISTS user_user_fts",
+]
+
+
+def run_vendor_sql(statements: dict):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0003_keyset_ordering"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    "postgresql": POSTGRESQL_FORWARDS,
+                    "sqlite": SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    "postgresql": POSTGRESQL_BACKWARDS,
+                    "sqlite": SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_following_count(apps, schema_editor):
+    User = apps.get_model("user", "User")
+    UserFollowing = apps.get_model("user", "UserFollowing")
+
+    following = (
+        UserFollowing.objects.filter(user_id=OuterRef("pk"))
+        .order_by()
+        .values("user_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    User.objects.update(
+        following_count=Coalesce(Subquery(following), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0005_profile_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_following_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="userfollowing",
+            index=models.Index(
+                fields=["following_user_id", "-created", "-id"],
+                name="following_user_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfollowing",
+            index=models.Index(
+                fields=["user_id", "-created", "-id"],
+                name="following_owner_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:05
+
+from django.db import migrations
+
+# With a collation other than C, LIKE 'abc%' can only use an index
+# built with a pattern operator class
+POSTGRESQL_FORWARDS = [
+    "CREATE INDEX user_nickname_prefix_idx "
+    "ON user_user (lower(nickname) varchar_pattern_ops)",
+    "CREATE INDEX user_email_prefix_idx "
+    "ON user_user (lower(email) varchar_pattern_ops)",
+]
+
+POSTGRESQL_BACKWARDS = [
+    "DROP INDEX IF EXISTS user_email_prefix_idx",
+    "DROP INDEX IF EXISTS user_nickname_prefix_idx",
+]
+
+# SQLite matches prefixes as ranges over these expression indexes
+SQLITE_FORWARDS = [
+    "CREATE INDEX user_nickname_prefix_idx ON user_user (lower(nickname))",
+    "CREATE INDEX user_email_prefix_idx ON user_user (lower(email))",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP INDEX IF EXISTS user_email_prefix_idx",
+    "DROP INDEX IF EXISTS user_nickname_prefix_idx",
+]
+
+
+def run_vendor_sql(statements: dict):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0007_follow_suggestions"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    "postgresql": POSTGRESQL_FORWARDS,
+                    "sqlite": SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    "postgresql": POSTGRESQL_BACKWARDS,
+                    "sqlite": SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+    ]
@@ -81,6 +81,19 @@ class User(AbstractUser):
     profile_image = models.ImageField(
         blank=True, upload_to=movie_image_file_path
     )
+    # filled in by the image pipeline, see social_media_api.images
+    profile_image_width = models.PositiveIntegerField(
+        null=True, editable=False
+    )
+    profile_image_height = models.PositiveIntegerField(
+        null=True, editable=False
+    )
+    profile_image_variants = models.JSONField(default=dict, editable=False)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    # set with is_active=False when the account is deleted, its rows are
+    # purged by a post.models.DeletionJob
+    deleted_at = models.DateTimeField(null=True, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["nickname", "date_of_birth"]
@@ -95,6 +108,11 @@ class User(AbstractUser):
                 name="You must be at least 5 years old!",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["-date_joined", "-id"], name="user_date_joined_id_idx"
+            ),
+        ]
 
     objects = UserManager()
 
@@ -119,8 +137,76 @@ class UserFollowing(models.Model):
                 name="unique_followers",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["following_user_id", "-created", "-id"],
+                name="following_user_created_idx",
+            ),
+            models.Index(
+                fields=["user_id", "-created", "-id"],
+                name="following_owner_created_idx",
+            ),
+        ]
 
-        ordering = ["-created"]
+        ordering = ["-created", "-id"]
 
     def __str__(self) -> str:
         return f"{self.user_id} follows {self.following_user_id}"
+
+
+class FollowSuggestion(models.Model):
+    """Precomputed "who to follow" entry, see user.suggestions"""
+
+    user = models.ForeignKey(
+        get_user_model(),
+        related_name="follow_suggestions",
+        on_delete=models.CASCADE,
+    )
+    suggested = models.ForeignKey(
+        get_user_model(),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    # followings of `user` that follow `suggested`
+    mutual_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "suggested"],
+                name="unique_follow_suggestion",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-mutual_count", "suggested"],
+                name="follow_suggestion_rank_idx",
+            ),
+        ]
+
+
+class Unfollow(models.Model):
+    """Follower who unfollowed someone, lets user.suggestions find the
+    users to recompute"""
+
+    user = models.ForeignKey(
+        get_user_model(),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class SuggestionRun(models.Model):
+    """Progress of a compute_follow_suggestions run, used to resume it"""
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+    # only users whose graph changed after this moment are recomputed,
+    # all of them when it is empty
+    since = models.DateTimeField(null=True)
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started_at", "-id"]
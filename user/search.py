@@ -0,0 +1,146 @@
+"""Fuzzy and prefix user lookup by nickname or email.
+
+PostgreSQL ranks by trigram word similarity backed by `gin_trgm_ops`
+indexes. SQLite, used for local runs, falls back to an FTS5 table with
+the trigram tokenizer kept in sync by the functions below.
+"""
+
+import sys
+from typing import Optional
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Lower
+
+from user.models import User
+
+# FTS5 trigram tokenizer cannot match shorter queries
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+
+def search_users(query: str) -> QuerySet[User]:
+    """Users whose nickname or email resembles `query`, best match first."""
+
+    query = query.strip()
+    if not query:
+        return User.objects.none()
+
+    users = User.objects.filter(deleted_at__isnull=True)
+    if connection.vendor == "postgresql":
+        return (
+            users.filter(
+                Q(nickname__trigram_word_similar=query)
+                | Q(email__trigram_word_similar=query)
+            )
+            .annotate(
+                rank=Greatest(
+                    TrigramWordSimilarity(query, "nickname"),
+                    TrigramWordSimilarity(query, "email"),
+                )
+            )
+            .order_by("-rank", "-id")
+        )
+
+    if len(query) < MIN_TRIGRAM_QUERY_LENGTH:
+        return users.filter(nickname__istartswith=query).order_by(
+            "nickname", "id"
+        )
+
+    match = '"{}"'.format(query.replace('"', '""'))
+    return (
+        users.filter(
+            id__in=RawSQL(
+                "SELECT rowid FROM user_user_fts WHERE user_user_fts MATCH %s",
+                (match,),
+            )
+        )
+        .annotate(
+            rank=RawSQL(
+                "SELECT -bm25(user_user_fts) FROM user_user_fts "
+                "WHERE user_user_fts MATCH %s AND rowid = user_user.id",
+                (match,),
+            )
+        )
+        .order_by("-rank", "-id")
+    )
+
+
+def _prefix_end(prefix: str) -> Optional[str]:
+    """Smallest string above every string starting with `prefix`, None
+    when the last character has no successor."""
+
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # surrogates cannot be encoded, skip to the next real character
+        code = 0xE000
+    if code > sys.maxunicode:
+        return None
+    return prefix[:-1] + chr(code)
+
+
+def autocomplete_users(prefix: str, limit: int) -> QuerySet[User]:
+    """First `limit` users whose nickname or email starts with `prefix`.
+
+    Matches go through the lower-case prefix indexes of migration
+    0008_autocomplete_indexes: pattern matching on PostgreSQL, a range
+    scan on SQLite, whose LIKE cannot use expression indexes.
+    """
+
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return User.objects.none()
+
+    users = User.objects.filter(deleted_at__isnull=True).annotate(
+        nickname_lower=Lower("nickname"), email_lower=Lower("email")
+    )
+    end = _prefix_end(prefix)
+    if connection.vendor == "postgresql" or end is None:
+        match = Q(nickname_lower__startswith=prefix) | Q(
+            email_lower__startswith=prefix
+        )
+    else:
+        match = Q(nickname_lower__gte=prefix, nickname_lower__lt=end) | Q(
+            email_lower__gte=prefix, email_lower__lt=end
+        )
+    return users.filter(match).order_by("nickname_lower", "id")[:limit]
+
+
+def index_user(user: User) -> None:
+    """Refreshes the SQLite FTS5 row of `user`."""
+
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM user_user_fts WHERE rowid = %s", [user.pk])
+        cursor.execute(
+            "INSERT INTO user_user_fts(rowid, nickname, email) "
+            "VALUES (%s, %s, %s)",
+            [user.pk, user.nickname, user.email],
+        )
+
+
+def unindex_user(user_id: int) -> None:
+    """Drops the SQLite FTS5 row of a deleted user."""
+
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM user_user_fts WHERE rowid = %s", [user_id])
+
+
+def rebuild_user_index() -> None:
+    """Reindexes all users after bulk writes that bypassed signals."""
+
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM user_user_fts")
+        cursor.execute(
+            "INSERT INTO user_user_fts(rowid, nickname, email) "
+            "SELECT id, nickname, email FROM user_user"
+        )
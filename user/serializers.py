@@ -1,11 +1,14 @@
 import datetime
+from typing import Optional
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.validators import UniqueTogetherValidator
 
-from user.models import User, UserFollowing
+from social_media_api import images
+from user.models import FollowSuggestion, User, UserFollowing
 
 
 class FollowingSerializer(serializers.ModelSerializer):
@@ -19,7 +22,7 @@ class FollowingSerializer(serializers.ModelSerializer):
         many=False,
         read_only=False,
         slug_field="email",
-        queryset=User.objects.all(),
+        queryset=User.objects.filter(deleted_at__isnull=True),
     )
 
     class Meta:
@@ -48,8 +51,7 @@ class FollowersSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
-    following = FollowingSerializer(many=True, read_only=True)
-    followers = FollowersSerializer(many=True, read_only=True)
+    profile_image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = get_user_model()
@@ -62,8 +64,11 @@ class UserSerializer(serializers.ModelSerializer):
             "biography",
             "date_of_birth",
             "profile_image",
-            "following",
-            "followers",
+            "profile_image_width",
+            "profile_image_height",
+            "profile_image_variants",
+            "followers_count",
+            "following_count",
         )
         read_only_fields = ("is_staff",)
         extra_kwargs = {"password": {"write_only": True, "min_length": 5}}
@@ -73,6 +78,13 @@ class UserSerializer(serializers.ModelSerializer):
 
         return get_user_model().objects.create_user(**validated_data)
 
+    def get_profile_image_variants(
+        self, obj: User
+    ) -> dict[str, dict[str, str]]:
+        return images.variant_urls(
+            obj, "profile_image", self.context.get("request")
+        )
+
     def update(self, instance: User, validated_data: dict) -> User:
         """Update a user, set the password correctly and return it"""
 
@@ -96,3 +108,48 @@ class UserSerializer(serializers.ModelSerializer):
             )
 
         return value
+
+
+class UserSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = get_user_model()
+        fields = ("id", "email", "nickname", "profile_image")
+
+
+class BulkFollowSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.FOLLOW_BULK_MAX_USERS,
+    )
+
+
+class BulkFollowResultSerializer(serializers.Serializer):
+    user = serializers.CharField()
+    status = serializers.CharField()
+
+
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+    user = UserSearchSerializer(source="suggested", read_only=True)
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ("user", "mutual_count")
+
+
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    avatar = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ("id", "nickname", "avatar")
+
+    def get_avatar(self, obj: User) -> Optional[str]:
+        request = self.context.get("request")
+        variants = images.variant_urls(obj, "profile_image", request)
+        if "thumbnail" in variants:
+            return variants["thumbnail"]["webp"]
+        if obj.profile_image:
+            url = obj.profile_image.url
+            return request.build_absolute_uri(url) if request else url
+        return None
@@ -0,0 +1,175 @@
+from typing import Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from user.models import User, UserFollowing
+from user.signals import followings_created, followings_deleted
+
+FOLLOWED = "followed"
+ALREADY_FOLLOWING = "already_following"
+UNFOLLOWED = "unfollowed"
+NOT_FOLLOWING = "not_following"
+NOT_FOUND = "not_found"
+SELF = "self"
+
+# largest value of a PostgreSQL bigint primary key
+MAX_ID = 2**63 - 1
+
+
+def _as_id(value: str) -> Optional[int]:
+    if value.isascii() and value.isdecimal() and int(value) <= MAX_ID:
+        return int(value)
+    return None
+
+
+def _resolve(identifiers: list[str]) -> dict[str, int]:
+    """Maps user IDs and emails to user IDs, in one query."""
+
+    ids = [pk for pk in map(_as_id, identifiers) if pk is not None]
+    emails = [value for value in identifiers if _as_id(value) is None]
+    found = User.objects.filter(
+        Q(pk__in=ids) | Q(email__in=emails), deleted_at__isnull=True
+    )
+
+    resolved = {}
+    for pk, email in found.values_list("pk", "email"):
+        resolved[str(pk)] = pk
+        resolved[email] = pk
+    return resolved
+
+
+def _returning(sql: str, params: list) -> list[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _insert_followings(user: User, user_ids: list[int]) -> list[int]:
+    """Follows `user_ids`, returns those that were not followed yet.
+
+    The INSERT itself reports the rows it created, so a concurrent
+    follow of the same user is never counted twice.
+    """
+
+    meta = UserFollowing._meta
+    quote = connection.ops.quote_name
+    columns = [
+        meta.get_field(name).column
+        for name in ("user_id", "following_user_id", "created")
+    ]
+    created = meta.get_field("created").get_db_prep_save(
+        timezone.now(), connection
+    )
+    params = []
+    for pk in user_ids:
+        params.extend([user.pk, pk, created])
+    return _returning(
+        f"INSERT INTO {quote(meta.db_table)} "
+        f"({', '.join(map(quote, columns))}) "
+        f"VALUES {', '.join(['(%s, %s, %s)'] * len(user_ids))} "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(columns[1])}",
+        params,
+    )
+
+
+def _delete_followings(user: User, user_ids: list[int]) -> list[int]:
+    """Unfollows `user_ids`, returns those that were followed."""
+
+    meta = UserFollowing._meta
+    quote = connection.ops.quote_name
+    follower, following = (
+        quote(meta.get_field(name).column)
+        for name in ("user_id", "following_user_id")
+    )
+    return _returning(
+        f"DELETE FROM {quote(meta.db_table)} WHERE {follower} = %s "
+        f"AND {following} IN ({', '.join(['%s'] * len(user_ids))}) "
+        f"RETURNING {following}",
+        [user.pk, *user_ids],
+    )
+
+
+def follow_many(user: User, identifiers: list[str]) -> list[dict]:
+    """Follows users by ID or email, returns the outcome per identifier."""
+
+    resolved = _resolve(identifiers)
+    targets = sorted({pk for pk in resolved.values() if pk != user.pk})
+
+    with transaction.atomic():
+        new_ids = _insert_followings(user, targets) if targets else []
+        if new_ids:
+            followings_created.send(
+                sender=UserFollowing, user_id=user.pk, following_ids=new_ids
+            )
+
+    results = []
+    for identifier in identifiers:
+        pk = resolved.get(identifier)
+        if pk is None:
+            status = NOT_FOUND
+        elif pk == user.pk:
+            status = SELF
+        elif pk in new_ids:
+            status = FOLLOWED
+        else:
+            status = ALREADY_FOLLOWING
+        results.append({"user": identifier, "status": status})
+    return results
+
+
+def unfollow_many(user: User, identifiers: list[str]) -> list[dict]:
+    """Unfollows users by ID or email, returns the outcome per identifier."""
+
+    resolved = _resolve(identifiers)
+    targets = sorted(set(resolved.values()))
+
+    with transaction.atomic():
+        # post_delete would be sent for every row, the batch is announced
+        # once instead
+        removed_ids = _delete_followings(user, targets) if targets else []
+        if removed_ids:
+            followings_deleted.send(
+                sender=UserFollowing,
+                user_id=user.pk,
+                following_ids=removed_ids,
+            )
+
+    results = []
+    for identifier in identifiers:
+        pk = resolved.get(identifier)
+        if pk is None:
+            status = NOT_FOUND
+        elif pk in removed_ids:
+            status = UNFOLLOWED
+        else:
+            status = NOT_FOLLOWING
+        results.append({"user": identifier, "status": status})
+    return results
+
+
+def _follow_total(field: str) -> Coalesce:
+    return Coalesce(
+        Subquery(
+            UserFollowing.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def refresh_follow_counters() -> None:
+    """Recomputes `followers_count`/`following_count` of every user.
+
+    For bulk loads that wrote `UserFollowing` rows without signals.
+    """
+
+    User.objects.update(
+        followers_count=_follow_total("following_user_id"),
+        following_count=_follow_total("user_id"),
+    )
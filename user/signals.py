@@ -0,0 +1,135 @@
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from social_media_api import images
+from social_media_api.cache import bump_version
+from user import authentication, graph, search
+from user.models import Unfollow, User, UserFollowing
+
+# Sent once per batch of followings created or deleted, whether by
+# saving a single UserFollowing or by the bulk follow endpoints, with
+# `user_id` (the follower) and `following_ids` (the followed users).
+followings_created = Signal()
+followings_deleted = Signal()
+
+
+@receiver(post_save, sender=UserFollowing)
+def announce_following(
+    sender: type, instance: UserFollowing, created: bool, **kwargs: dict
+) -> None:
+    if created:
+        followings_created.send(
+            sender=UserFollowing,
+            user_id=instance.user_id_id,
+            following_ids=[instance.following_user_id_id],
+        )
+
+
+@receiver(post_delete, sender=UserFollowing)
+def announce_unfollowing(
+    sender: type, instance: UserFollowing, **kwargs: dict
+) -> None:
+    followings_deleted.send(
+        sender=UserFollowing,
+        user_id=instance.user_id_id,
+        following_ids=[instance.following_user_id_id],
+    )
+
+
+@receiver(followings_created)
+def count_follow(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    User.objects.filter(pk__in=following_ids).update(
+        followers_count=F("followers_count") + 1
+    )
+    User.objects.filter(pk=user_id).update(
+        following_count=F("following_count") + len(following_ids)
+    )
+
+
+@receiver(followings_deleted)
+def count_unfollow(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    User.objects.filter(pk__in=following_ids).update(
+        followers_count=Greatest(F("followers_count") - 1, 0)
+    )
+    User.objects.filter(pk=user_id).update(
+        following_count=Greatest(F("following_count") - len(following_ids), 0)
+    )
+
+
+@receiver(followings_deleted)
+def record_unfollow(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    # the next incremental suggestion run recomputes around the follower
+    Unfollow.objects.create(user_id=user_id)
+
+
+@receiver(followings_created)
+@receiver(followings_deleted)
+def invalidate_graph(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    graph.invalidate_following(user_id)
+    # the popular set only changes when a count crosses the limit
+    limit = settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    if User.objects.filter(
+        pk__in=following_ids,
+        followers_count__in=(limit, limit + 1),
+    ).exists():
+        graph.invalidate_popular()
+
+
+@receiver(post_save, sender=User)
+def index_user(
+    sender: type,
+    instance: User,
+    update_fields: Optional[frozenset] = None,
+    **kwargs: dict,
+) -> None:
+    if update_fields is None or {"nickname", "email"} & update_fields:
+        search.index_user(instance)
+
+
+@receiver(post_save, sender=User)
+def process_profile_image(
+    sender: type, instance: User, **kwargs: dict
+) -> None:
+    images.schedule_variants(instance, "profile_image")
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender: type, instance: User, **kwargs: dict) -> None:
+    search.unindex_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender: type, instance: User, **kwargs: dict) -> None:
+    bump_version("user", instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_authenticated_user(
+    sender: type, instance: User, **kwargs: dict
+) -> None:
+    authentication.forget_user(instance.pk)
+
+
+@receiver(followings_created)
+@receiver(followings_deleted)
+def invalidate_following(
+    sender: type, user_id: int, following_ids: list[int], **kwargs: dict
+) -> None:
+    bump_version("user", user_id)
+    for following_id in following_ids:
+        bump_version("user", following_id)
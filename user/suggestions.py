@@ -0,0 +1,167 @@
+"""Precomputed "who to follow" suggestions.
+
+Users followed by many of the users someone follows are suggested to
+them, ranked by that mutual count. Suggestions are computed offline by
+the `compute_follow_suggestions` command in batches of users, one SQL
+statement per batch, and stored as the top
+`settings.FOLLOW_SUGGESTIONS_PER_USER` rows per user.
+"""
+
+from datetime import datetime
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from user.models import (
+    FollowSuggestion,
+    SuggestionRun,
+    Unfollow,
+    User,
+    UserFollowing,
+)
+
+RANK_SQL = """
+WITH pairs AS (
+    SELECT mine.user_id_id AS user_id,
+        theirs.following_user_id_id AS suggested_id,
+        COUNT(*) AS mutual_count
+    FROM user_userfollowing mine
+    JOIN user_userfollowing theirs
+        ON theirs.user_id_id = mine.following_user_id_id
+    WHERE mine.user_id_id IN ({users})
+        AND theirs.following_user_id_id <> mine.user_id_id
+        AND NOT EXISTS (
+            SELECT 1 FROM user_userfollowing followed
+            WHERE followed.user_id_id = mine.user_id_id
+                AND followed.following_user_id_id
+                    = theirs.following_user_id_id
+        )
+    GROUP BY mine.user_id_id, theirs.following_user_id_id
+), ranked AS (
+    SELECT pairs.user_id, pairs.suggested_id, pairs.mutual_count,
+        ROW_NUMBER() OVER (
+            PARTITION BY pairs.user_id
+            ORDER BY pairs.mutual_count DESC,
+                candidate.followers_count DESC,
+                pairs.suggested_id
+        ) AS position
+    FROM pairs
+    JOIN user_user candidate ON candidate.id = pairs.suggested_id
+    WHERE candidate.is_active = %s
+)
+SELECT user_id, suggested_id, mutual_count FROM ranked WHERE position <= %s
+"""
+
+
+def rank_suggestions(
+    user_ids: list[int], limit: int
+) -> list[FollowSuggestion]:
+    """Top `limit` suggestions of each of `user_ids`, in one query."""
+
+    sql = RANK_SQL.format(users=", ".join(["%s"] * len(user_ids)))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*user_ids, True, limit])
+        return [
+            FollowSuggestion(
+                user_id=user_id,
+                suggested_id=suggested_id,
+                mutual_count=mutual_count,
+            )
+            for user_id, suggested_id, mutual_count in cursor.fetchall()
+        ]
+
+
+def changed_users(since: Optional[datetime]) -> QuerySet[User]:
+    """Users whose second-degree connections changed after `since`."""
+
+    if since is None:
+        return User.objects.all()
+
+    changed = Q()
+    for followers in (
+        UserFollowing.objects.filter(created__gte=since).values("user_id"),
+        Unfollow.objects.filter(created__gte=since).values("user"),
+    ):
+        changed |= Q(pk__in=followers) | Q(
+            following__following_user_id__in=followers
+        )
+    return User.objects.filter(changed).distinct()
+
+
+def start_run(full: bool = False) -> SuggestionRun:
+    """Resumes an interrupted run, or starts one after the last finished.
+
+    A new run only recomputes users affected by follows created or
+    removed since the previous run started. `full` replaces an
+    interrupted run with one recomputing all users.
+    """
+
+    unfinished = SuggestionRun.objects.filter(finished_at=None)
+    if full:
+        unfinished.delete()
+    elif unfinished.exists():
+        return unfinished.first()
+
+    previous = SuggestionRun.objects.exclude(finished_at=None).first()
+    since = None if full or previous is None else previous.started_at
+    return SuggestionRun.objects.create(since=since)
+
+
+def compute_suggestions(
+    run: SuggestionRun,
+    batch_size: int = 500,
+    progress: Optional[Callable[[SuggestionRun], None]] = None,
+) -> SuggestionRun:
+    """Computes suggestions for the users of `run` left to process.
+
+    Every batch is stored together with the run checkpoint, so an
+    interrupted run continues after the last stored batch.
+    """
+
+    users = changed_users(run.since).order_by("pk")
+    limit = settings.FOLLOW_SUGGESTIONS_PER_USER
+    while True:
+        user_ids = list(
+            users.filter(pk__gt=run.last_user_id).values_list("pk", flat=True)[
+                :batch_size
+            ]
+        )
+        if not user_ids:
+            break
+
+        suggestions = rank_suggestions(user_ids, limit)
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+            FollowSuggestion.objects.bulk_create(suggestions)
+            run.last_user_id = user_ids[-1]
+            run.processed += len(user_ids)
+            run.save(update_fields=["last_user_id", "processed"])
+        if progress is not None:
+            progress(run)
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
+    SuggestionRun.objects.filter(started_at__lt=run.started_at).delete()
+    # later runs only look at what happened after this one started
+    Unfollow.objects.filter(created__lt=run.started_at).delete()
+    return run
+
+
+def suggestions_for(user: User) -> QuerySet[FollowSuggestion]:
+    """Stored suggestions of `user`, minus users followed since."""
+
+    return (
+        FollowSuggestion.objects.filter(
+            user=user, suggested__deleted_at__isnull=True
+        )
+        .exclude(
+            suggested__in=UserFollowing.objects.filter(user_id=user).values(
+                "following_user_id"
+            )
+        )
+        .select_related("suggested")
+        .order_by("-mutual_count", "suggested")
+    )
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+SUGGESTIONS_URL = reverse("users:suggestions")
+MANAGE_URL = reverse("users:manage")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        caches["auth"].clear()
+        self.user = get_user_model().objects.create_user(
+            email="token@gmail.com",
+            nickname="token",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_loaded_once(self) -> None:
+        # user row + suggestions
+        with self.assertNumQueries(2):
+            first = self.client.get(SUGGESTIONS_URL)
+        # suggestions only
+        with self.assertNumQueries(1):
+            second = self.client.get(SUGGESTIONS_URL)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self) -> None:
+        self.client.get(SUGGESTIONS_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(SUGGESTIONS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_reloads_user(self) -> None:
+        self.client.get(SUGGESTIONS_URL)
+
+        self.client.patch(MANAGE_URL, {"password": "changed"})
+
+        with self.assertNumQueries(2):
+            self.client.get(SUGGESTIONS_URL)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("changed"))
+
+    def test_forged_token_is_rejected(self) -> None:
+        token = str(AccessToken.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}x")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(SUGGESTIONS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from post import services
+from post.models import Commentary, Post
+from user.models import UserFollowing
+
+EXPORT_URL = reverse("users:export")
+
+
+class ExportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="export@gmail.com",
+            nickname="export",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.friend = get_user_model().objects.create_user(
+            email="friend@gmail.com",
+            nickname="friend",
+            date_of_birth="2012-01-01",
+            password="test1",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        post = Post.objects.create(content="mine", user=self.user)
+        Post.objects.create(content="theirs", user=self.friend)
+        Commentary.objects.create(commentary="hi", post=post, user=self.user)
+        services.add_like(post.id, self.user)
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.friend
+        )
+        UserFollowing.objects.create(
+            user_id=self.friend, following_user_id=self.user
+        )
+
+    def assertExport(self, content: bytes) -> None:
+        records = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(
+            [record["type"] for record in records],
+            ["user", "post", "commentary", "like", "following", "follower"],
+        )
+        self.assertEqual(records[1]["content"], "mine")
+        self.assertEqual(records[3]["object_type"], "post")
+        self.assertEqual(records[4]["user"], "friend@gmail.com")
+
+    def test_export_is_streamed(self) -> None:
+        response = self.client.get(EXPORT_URL)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertExport(b"".join(response.streaming_content))
+
+    async def test_export_is_streamed_under_asgi(self) -> None:
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        response = await self.async_client.get(
+            EXPORT_URL,
+            {"gzip": "true"},
+            headers={"AUTHORIZATION": f"Bearer {token}"},
+        )
+
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response])
+        self.assertExport(gzip.decompress(content))
+
+    def test_gzip_export(self) -> None:
+        response = self.client.get(EXPORT_URL, {"gzip": "true"})
+
+        self.assertIn(".ndjson.gz", response["Content-Disposition"])
+        self.assertExport(
+            gzip.decompress(b"".join(response.streaming_content))
+        )
+
+    def test_export_command(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.ndjson.gz")
+            call_command(
+                "export_user_data",
+                self.user.email,
+                output=path,
+                gzip=True,
+                stderr=StringIO(),
+            )
+            with gzip.open(path) as export:
+                self.assertExport(export.read())
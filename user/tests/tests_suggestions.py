@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.models import FollowSuggestion, SuggestionRun, UserFollowing
+from user.suggestions import compute_suggestions, start_run
+
+SUGGESTIONS_URL = reverse("users:suggestions")
+
+
+class FollowSuggestionTests(TestCase):
+    def setUp(self) -> None:
+        self.users = {
+            name: get_user_model().objects.create_user(
+                email=f"{name}@gmail.com",
+                nickname=name,
+                date_of_birth="2012-01-01",
+                password="test1",
+            )
+            for name in ("me", "anna", "bob", "xena", "yuri")
+        }
+        self.follow("me", "anna")
+        self.follow("me", "bob")
+        self.follow("anna", "me")
+        self.follow("anna", "xena")
+        self.follow("anna", "yuri")
+        self.follow("bob", "xena")
+        self.client = APIClient()
+        self.client.force_authenticate(self.users["me"])
+
+    def follow(self, follower: str, followed: str) -> UserFollowing:
+        return UserFollowing.objects.create(
+            user_id=self.users[follower],
+            following_user_id=self.users[followed],
+        )
+
+    def suggested(self) -> list[tuple[str, int]]:
+        return [
+            (row["user"]["nickname"], row["mutual_count"])
+            for row in self.client.get(SUGGESTIONS_URL).data
+        ]
+
+    def test_suggestions_ranked_by_mutual_followings(self) -> None:
+        call_command("compute_follow_suggestions", stdout=StringIO())
+
+        with self.assertNumQueries(1):
+            self.client.get(SUGGESTIONS_URL)
+        self.assertEqual(self.suggested(), [("xena", 2), ("yuri", 1)])
+
+    def test_followed_users_are_not_suggested(self) -> None:
+        call_command("compute_follow_suggestions", stdout=StringIO())
+        self.follow("me", "xena")
+
+        self.assertEqual(self.suggested(), [("yuri", 1)])
+
+    def test_interrupted_run_is_resumed(self) -> None:
+        run = SuggestionRun.objects.create(
+            last_user_id=self.users["me"].pk, processed=1
+        )
+
+        call_command("compute_follow_suggestions", stdout=StringIO())
+
+        run.refresh_from_db()
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(run.processed, 5)
+        self.assertFalse(
+            FollowSuggestion.objects.filter(user=self.users["me"]).exists()
+        )
+        self.assertTrue(
+            FollowSuggestion.objects.filter(
+                user=self.users["anna"], suggested=self.users["bob"]
+            ).exists()
+        )
+
+    def test_full_run_replaces_interrupted_run(self) -> None:
+        compute_suggestions(start_run())
+        interrupted = SuggestionRun.objects.create(
+            since=SuggestionRun.objects.get().started_at,
+            last_user_id=self.users["me"].pk,
+            processed=1,
+        )
+
+        call_command(
+            "compute_follow_suggestions", full=True, stdout=StringIO()
+        )
+
+        self.assertFalse(
+            SuggestionRun.objects.filter(pk=interrupted.pk).exists()
+        )
+        run = SuggestionRun.objects.first()
+        self.assertIsNone(run.since)
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(run.processed, 5)
+
+    def test_incremental_run_recomputes_changed_users(self) -> None:
+        compute_suggestions(start_run())
+        self.follow("bob", "yuri")
+
+        run = compute_suggestions(start_run())
+
+        # bob followed yuri, and me follows bob
+        self.assertEqual(run.processed, 2)
+        self.assertEqual(self.suggested(), [("xena", 2), ("yuri", 2)])
+
+    def test_incremental_run_recomputes_after_unfollow(self) -> None:
+        compute_suggestions(start_run())
+        UserFollowing.objects.get(
+            user_id=self.users["bob"], following_user_id=self.users["xena"]
+        ).delete()
+
+        run = compute_suggestions(start_run())
+
+        self.assertEqual(run.processed, 2)
+        self.assertEqual(self.suggested(), [("xena", 1), ("yuri", 1)])
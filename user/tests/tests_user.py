@@ -1,12 +1,18 @@
 import datetime
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
 from rest_framework.test import APIClient
 
+from post.models import Post, TimelineEntry
+from user import graph
+from user.models import UserFollowing
 from user.serializers import UserSerializer
 
 USERS_URL = reverse("users:create")
@@ -83,5 +89,319 @@ class UserApiTests(TestCase):
 
         response = self.client.get(USERS_URL, params={"nickname": "green"})
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertIn(serializer2.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertIn(serializer2.data, response.data["results"])
+
+    def test_search_users(self) -> None:
+        url = reverse("users:search")
+
+        by_nickname = self.client.get(url, {"q": "gree"})
+        by_email = self.client.get(url, {"q": "test1@"})
+        empty = self.client.get(url, {"q": ""})
+
+        self.assertEqual(
+            [user["id"] for user in by_nickname.data["results"]],
+            [self.user2.id],
+        )
+        self.assertEqual(
+            [user["id"] for user in by_email.data["results"]], [self.user.id]
+        )
+        self.assertEqual(empty.data["results"], [])
+
+    def test_profile_cache_follows_followings(self) -> None:
+        cache.clear()
+        url = reverse("users:retrieve", kwargs={"pk": self.user2.id})
+        self.client.get(url)
+        cached = self.client.get(url)
+
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.user2
+        )
+        refreshed = self.client.get(url)
+
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(refreshed["X-Cache"], "MISS")
+        self.assertEqual(refreshed.data["followers_count"], 1)
+
+    def test_follow_counts(self) -> None:
+        following = UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.user2
+        )
+        self.user.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual(
+            (self.user.following_count, self.user2.followers_count), (1, 1)
+        )
+
+        following.delete()
+        self.user.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual(
+            (self.user.following_count, self.user2.followers_count), (0, 0)
+        )
+
+    def test_followers_and_following_endpoints(self) -> None:
+        for index in range(3):
+            follower = get_user_model().objects.create_user(
+                email=f"follower{index}@gmail.com",
+                password="555qaz",
+                nickname=f"follower{index}",
+                date_of_birth=datetime.date(2012, 2, 12),
+            )
+            UserFollowing.objects.create(
+                user_id=follower, following_user_id=self.user2
+            )
+        UserFollowing.objects.create(
+            user_id=self.user2, following_user_id=self.user
+        )
+        followers_url = reverse(
+            "users:followers", kwargs={"pk": self.user2.id}
+        )
+        following_url = reverse(
+            "users:following", kwargs={"pk": self.user2.id}
+        )
+
+        with self.assertNumQueries(2):
+            first = self.client.get(followers_url, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+        following = self.client.get(following_url)
+
+        self.assertEqual(
+            [row["user_id"] for row in first.data["results"]]
+            + [row["user_id"] for row in second.data["results"]],
+            [
+                "follower2@gmail.com",
+                "follower1@gmail.com",
+                "follower0@gmail.com",
+            ],
+        )
+        self.assertIsNone(second.data["next"])
+        self.assertEqual(
+            [row["following_user_id"] for row in following.data["results"]],
+            [self.user.email],
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("users:followers", kwargs={"pk": 0})
+            ).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_profile_does_not_list_followers(self) -> None:
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.user2
+        )
+        response = self.client.get(
+            reverse("users:retrieve", kwargs={"pk": self.user2.id})
+        )
+
+        self.assertNotIn("followers", response.data)
+        self.assertEqual(response.data["followers_count"], 1)
+        self.assertEqual(response.data["following_count"], 0)
+
+    def test_follow_graph_cache(self) -> None:
+        cache.clear()
+        self.assertEqual(list(graph.following_ids(self.user.id)), [])
+
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.user2
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(graph.following_ids(self.user.id)), [self.user2.id]
+            )
+        with self.assertNumQueries(0):
+            graph.following_ids(self.user.id)
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0)
+    def test_popular_users_cache(self) -> None:
+        cache.clear()
+        self.assertFalse(graph.is_popular(self.user2.id))
+
+        following = UserFollowing.objects.create(
+            user_id=self.user, following_user_id=self.user2
+        )
+        self.assertTrue(graph.is_popular(self.user2.id))
+        self.assertEqual(
+            graph.followed_popular_ids(self.user.id), [self.user2.id]
+        )
+
+        following.delete()
+        self.assertFalse(graph.is_popular(self.user2.id))
+
+    def test_bulk_follow_and_unfollow(self) -> None:
+        others = [
+            get_user_model().objects.create_user(
+                email=f"bulk{index}@gmail.com",
+                password="555qaz",
+                nickname=f"bulk{index}",
+                date_of_birth=datetime.date(2012, 2, 12),
+            )
+            for index in range(3)
+        ]
+        UserFollowing.objects.create(
+            user_id=self.user, following_user_id=others[0]
+        )
+        Post.objects.create(content="backfilled", user=others[1])
+        users = [
+            others[0].email,
+            str(others[1].id),
+            others[2].email,
+            self.user.email,
+            "missing@gmail.com",
+        ]
+
+        response = self.client.post(
+            reverse("users:following-list-bulk-follow"),
+            {"users": users},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["status"] for row in response.data],
+            [
+                "already_following",
+                "followed",
+                "followed",
+                "self",
+                "not_found",
+            ],
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.following_count, 3)
+        self.assertEqual(
+            sorted(graph.following_ids(self.user.id)),
+            [other.id for other in others],
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                owner=self.user, post__user=others[1]
+            ).exists()
+        )
+
+        response = self.client.post(
+            reverse("users:following-list-bulk-unfollow"),
+            {"users": [others[0].email, others[1].email, self.user2.email]},
+            format="json",
+        )
+
+        self.assertEqual(
+            [row["status"] for row in response.data],
+            ["unfollowed", "unfollowed", "not_following"],
+        )
+        self.user.refresh_from_db()
+        others[1].refresh_from_db()
+        self.assertEqual(self.user.following_count, 1)
+        self.assertEqual(others[1].followers_count, 0)
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                owner=self.user, post__user=others[1]
+            ).exists()
+        )
+
+    def test_bulk_follow_odd_identifiers_are_not_found(self) -> None:
+        users = ["\u00b2", "\u0663", str(2**64), str(self.user2.id)]
+
+        response = self.client.post(
+            reverse("users:following-list-bulk-follow"),
+            {"users": users},
+            format="json",
+        )
+        again = self.client.post(
+            reverse("users:following-list-bulk-follow"),
+            {"users": [str(self.user2.id)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["status"] for row in response.data],
+            ["not_found", "not_found", "not_found", "followed"],
+        )
+        self.assertEqual(again.data[0]["status"], "already_following")
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.followers_count, 1)
+
+    def test_bulk_follow_queries_do_not_depend_on_batch_size(self) -> None:
+        def bulk_follow(count: int) -> int:
+            emails = []
+            for index in range(count):
+                emails.append(f"batch{count}-{index}@gmail.com")
+                get_user_model().objects.create_user(
+                    email=emails[-1],
+                    password="555qaz",
+                    nickname=f"b{count}-{index}",
+                    date_of_birth=datetime.date(2012, 2, 12),
+                )
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(
+                    reverse("users:following-list-bulk-follow"),
+                    {"users": emails},
+                    format="json",
+                )
+            return len(queries)
+
+        self.assertEqual(bulk_follow(2), bulk_follow(10))
+
+    def test_autocomplete_users(self) -> None:
+        cache.clear()
+        url = reverse("users:autocomplete")
+        get_user_model().objects.create_user(
+            email="grey@gmail.com",
+            password="555qaz",
+            nickname="Grace",
+            date_of_birth=datetime.date(2012, 2, 12),
+        )
+
+        by_nickname = self.client.get(url, {"q": "GR"})
+        by_email = self.client.get(url, {"q": "test1"})
+        empty = self.client.get(url, {"q": " "})
+
+        self.assertEqual(
+            [user["nickname"] for user in by_nickname.data],
+            ["Grace", "green"],
+        )
+        self.assertEqual(
+            set(by_nickname.data[0]), {"id", "nickname", "avatar"}
+        )
+        self.assertEqual([user["nickname"] for user in by_email.data], ["red"])
+        self.assertEqual(empty.data, [])
+
+    def test_autocomplete_prefix_ending_in_last_code_point(self) -> None:
+        cache.clear()
+        get_user_model().objects.create_user(
+            email="edge@gmail.com",
+            password="555qaz",
+            nickname="gr\U0010ffffx",
+            date_of_birth=datetime.date(2012, 2, 12),
+        )
+
+        response = self.client.get(
+            reverse("users:autocomplete"), {"q": "gr\U0010ffff"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [user["nickname"] for user in response.data], ["gr\U0010ffffx"]
+        )
+
+    def test_autocomplete_caches_prefixes(self) -> None:
+        cache.clear()
+        url = reverse("users:autocomplete")
+        self.client.get(url, {"q": "gr"})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "Gr "})
+        self.assertEqual(
+            [user["nickname"] for user in response.data], ["green"]
+        )
+
+    @override_settings(USER_AUTOCOMPLETE_LIMIT=1)
+    def test_autocomplete_is_limited(self) -> None:
+        cache.clear()
+        response = self.client.get(
+            reverse("users:autocomplete"), {"q": "test"}
+        )
+
+        self.assertEqual(len(response.data), 1)
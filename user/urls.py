@@ -6,11 +6,18 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from user.async_views import AsyncRetrieveUserView
 from user.views import (
     CreateUserView,
+    ExportUserView,
     ManageUserView,
     UserFollowingViewSet,
     RetrieveUserView,
+    UserSearchView,
+    UserFollowersView,
+    UserFollowedView,
+    FollowSuggestionView,
+    UserAutocompleteView,
 )
 
 router = routers.DefaultRouter()
@@ -19,11 +26,34 @@ router.register("followings", UserFollowingViewSet, basename="following-list")
 urlpatterns = [
     path("", CreateUserView.as_view(), name="create"),
     path("<int:pk>/", RetrieveUserView.as_view(), name="retrieve"),
+    path(
+        "async/<int:pk>/",
+        AsyncRetrieveUserView.as_view(),
+        name="async-retrieve",
+    ),
+    path(
+        "<int:pk>/followers/",
+        UserFollowersView.as_view(),
+        name="followers",
+    ),
+    path(
+        "<int:pk>/following/",
+        UserFollowedView.as_view(),
+        name="following",
+    ),
+    path("search/", UserSearchView.as_view(), name="search"),
+    path(
+        "autocomplete/",
+        UserAutocompleteView.as_view(),
+        name="autocomplete",
+    ),
+    path("suggestions/", FollowSuggestionView.as_view(), name="suggestions"),
     path("", include(router.urls)),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("me/export/", ExportUserView.as_view(), name="export"),
 ]
 
 app_name = "users"
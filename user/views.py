@@ -1,31 +1,52 @@
+import hashlib
+from typing import Callable
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import generics, viewsets
+from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from post import deletion
+from user import export, services
 from user.models import User, UserFollowing
 from user.permissions import IsAuthenticatedOrAnonymous, IsOwnerFollowing
+from social_media_api.cache import CachedRetrieveMixin
+from social_media_api.db_router import ReplicaReadMixin
+from social_media_api.pagination import RankedPagination
+from user.search import autocomplete_users, search_users
+from user.suggestions import suggestions_for
 from user.serializers import (
+    BulkFollowResultSerializer,
+    BulkFollowSerializer,
+    FollowSuggestionSerializer,
     UserSerializer,
+    FollowersSerializer,
     FollowingSerializer,
+    UserSearchSerializer,
+    UserAutocompleteSerializer,
 )
 
 
-class CreateUserView(generics.ListCreateAPIView):
+class CreateUserView(ReplicaReadMixin, generics.ListCreateAPIView):
     """Create new user"""
 
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticatedOrAnonymous,)
 
     def get_queryset(self) -> QuerySet:
-        queryset = get_user_model().objects.prefetch_related(
-            "following",
-            "followers",
-        )
+        queryset = get_user_model().objects.filter(
+            deleted_at__isnull=True
+        ).order_by("-date_joined", "-id")
         nickname = self.request.query_params.get("nickname")
 
         if self.request.user.is_authenticated and nickname:
@@ -46,22 +67,155 @@ class CreateUserView(generics.ListCreateAPIView):
         return super().list(request, *args, **kwargs)
 
 
+class UserSearchView(generics.ListAPIView):
+    """Fuzzy search of users by nickname or email"""
+
+    serializer_class = UserSearchSerializer
+    pagination_class = RankedPagination
+
+    def get_queryset(self) -> QuerySet:
+        return search_users(self.request.query_params.get("q", ""))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                description="Nickname or email to look for (ex. ?q=monik)",
+            ),
+        ]
+    )
+    def get(self, request: Request, *args: tuple, **kwargs: dict) -> Response:
+        return super().get(request, *args, **kwargs)
+
+
+class UserAutocompleteView(generics.ListAPIView):
+    """Users whose nickname or email starts with the given prefix"""
+
+    serializer_class = UserAutocompleteSerializer
+    pagination_class = None
+
+    def get_queryset(self) -> QuerySet:
+        return autocomplete_users(
+            self.request.query_params.get("q", ""),
+            settings.USER_AUTOCOMPLETE_LIMIT,
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                description="Nickname or email prefix (ex. ?q=mon)",
+            ),
+        ]
+    )
+    def get(self, request: Request, *args: tuple, **kwargs: dict) -> Response:
+        prefix = request.query_params.get("q", "").strip().lower()
+        # popular prefixes are requested by everyone typing a name
+        key = "autocomplete:" + hashlib.sha1(prefix.encode()).hexdigest()
+        data = cache.get(key)
+        if data is None:
+            data = super().get(request, *args, **kwargs).data
+            cache.set(key, data, timeout=settings.USER_AUTOCOMPLETE_CACHE_TTL)
+
+        return Response(data)
+
+
+class FollowSuggestionView(generics.ListAPIView):
+    """Users followed by the people you follow"""
+
+    serializer_class = FollowSuggestionSerializer
+    pagination_class = None
+
+    def get_queryset(self) -> QuerySet:
+        return suggestions_for(self.request.user)
+
+
 class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
     """Update user witch already login"""
 
     serializer_class = UserSerializer
 
     def get_object(self) -> User:
-        return self.request.user
+        # request.user may come from the authentication cache, while
+        # counters and image variants are updated without saving the user
+        return get_user_model().objects.get(pk=self.request.user.pk)
 
+    def perform_destroy(self, instance: User) -> None:
+        deletion.delete_account(instance)
 
-class RetrieveUserView(generics.RetrieveAPIView):
+
+class ExportUserView(generics.GenericAPIView):
+    """Download all your posts, comments, likes and followings as NDJSON"""
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="gzip",
+                type=OpenApiTypes.BOOL,
+                description="Compress the export (ex. ?gzip=true)",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.BINARY},
+    )
+    def get(
+        self, request: Request, *args: tuple, **kwargs: dict
+    ) -> StreamingHttpResponse:
+        chunks = export.ndjson_lines(request.user)
+        filename = f"export-{request.user.pk}.ndjson"
+        content_type = "application/x-ndjson"
+        if request.query_params.get("gzip") in ("true", "1"):
+            chunks = export.gzip_chunks(chunks)
+            filename += ".gz"
+            content_type = "application/gzip"
+
+        if isinstance(request._request, ASGIRequest):
+            chunks = export.async_chunks(chunks)
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class RetrieveUserView(
+    ReplicaReadMixin, CachedRetrieveMixin, generics.RetrieveAPIView
+):
     """Retrieve user witch already login"""
 
-    queryset = get_user_model().objects.all()
+    cache_kind = "user"
+    queryset = get_user_model().objects.filter(deleted_at__isnull=True)
     serializer_class = UserSerializer
 
 
+class UserFollowersView(generics.ListAPIView):
+    """Followers of a user, the latest first"""
+
+    serializer_class = FollowersSerializer
+
+    def get_queryset(self) -> QuerySet:
+        user = get_object_or_404(
+            get_user_model(), pk=self.kwargs["pk"], deleted_at__isnull=True
+        )
+        return UserFollowing.objects.filter(
+            following_user_id=user, user_id__deleted_at__isnull=True
+        ).select_related("user_id")
+
+
+class UserFollowedView(generics.ListAPIView):
+    """Users followed by a user, the latest first"""
+
+    serializer_class = FollowingSerializer
+
+    def get_queryset(self) -> QuerySet:
+        user = get_object_or_404(
+            get_user_model(), pk=self.kwargs["pk"], deleted_at__isnull=True
+        )
+        return UserFollowing.objects.filter(
+            user_id=user, following_user_id__deleted_at__isnull=True
+        ).select_related("user_id", "following_user_id")
+
+
 class UserFollowingViewSet(viewsets.ModelViewSet):
     """Following users"""
 
@@ -77,3 +231,33 @@ class UserFollowingViewSet(viewsets.ModelViewSet):
             raise ValidationError("You cannot sign other users!")
 
         return super().create(request, *args, **kwargs)
+
+    def _bulk(self, request: Request, apply: Callable) -> Response:
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = apply(request.user, serializer.validated_data["users"])
+
+        return Response(
+            BulkFollowResultSerializer(results, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        request=BulkFollowSerializer,
+        responses=BulkFollowResultSerializer(many=True),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-follow")
+    def bulk_follow(self, request: Request) -> Response:
+        """Follow many users, given by ID or email, at once"""
+
+        return self._bulk(request, services.follow_many)
+
+    @extend_schema(
+        request=BulkFollowSerializer,
+        responses=BulkFollowResultSerializer(many=True),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-unfollow")
+    def bulk_unfollow(self, request: Request) -> Response:
+        """Unfollow many users, given by ID or email, at once"""
+
+        return self._bulk(request, services.unfollow_many)